@@ -25,11 +25,6 @@ UTILS_DIR = SRC_DIR / "utils"
 OUTPUT_DIR = PROJECT_ROOT / "output"
 LOGS_DIR = PROJECT_ROOT / "logs"
 
-# Create directories if they don't exist
-for directory in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, SCRAPED_DATA_DIR, 
-                 ANALYZED_DATA_DIR, OUTPUT_DIR, LOGS_DIR]:
-    directory.mkdir(exist_ok=True)
-
 # Scraping settings
 DEFAULT_DELAY = 1.0
 DEFAULT_MAX_PAGES = 10
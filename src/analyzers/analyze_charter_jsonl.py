@@ -5,23 +5,17 @@ Simple Charter Schools JSONL Analysis Script
 Analyzes the charter schools JSONL file to extract and analyze unique websites.
 """
 
-import json
+import orjson
 from collections import Counter
 import re
 
-def analyze_charter_jsonl(jsonl_file):
-    """Analyze charter schools from JSONL file."""
-    
-    print(f"Loading charter schools from {jsonl_file}...")
-    
-    websites = []
-    total_schools = 0
-    
-    with open(jsonl_file, 'r', encoding='utf-8') as f:
+def _iter_websites(jsonl_file, stats):
+    """Yield the cleaned website of each school, counting rows into stats['total_schools']."""
+    with open(jsonl_file, 'rb') as f:
         for line in f:
             if line.strip():
-                total_schools += 1
-                data = json.loads(line)
+                stats['total_schools'] += 1
+                data = orjson.loads(line)
                 web_addr = data.get('web address', '').strip()
                 
                 # Clean up the web address
@@ -29,15 +23,23 @@ def analyze_charter_jsonl(jsonl_file):
                     # Remove "Link opens new browser tab" suffix
                     clean_url = web_addr.replace(' Link opens new browser tab', '').strip()
                     if clean_url:
-                        websites.append(clean_url)
+                        yield clean_url
+
+def analyze_charter_jsonl(jsonl_file):
+    """Analyze charter schools from JSONL file."""
+    
+    print(f"Loading charter schools from {jsonl_file}...")
     
-    # Count unique websites
-    website_counts = Counter(websites)
+    # Count unique websites straight from the stream; no intermediate list
+    stats = {'total_schools': 0}
+    website_counts = Counter(_iter_websites(jsonl_file, stats))
+    total_schools = stats['total_schools']
+    websites_count = sum(website_counts.values())
     
     print(f"\n=== CHARTER SCHOOLS ANALYSIS ===")
     print(f"Total schools: {total_schools}")
-    print(f"Schools with websites: {len(websites)}")
-    print(f"Schools without websites: {total_schools - len(websites)}")
+    print(f"Schools with websites: {websites_count}")
+    print(f"Schools without websites: {total_schools - websites_count}")
     print(f"Unique websites: {len(website_counts)}")
     print()
     
@@ -51,7 +53,7 @@ def analyze_charter_jsonl(jsonl_file):
     
     print("=== TOP 20 MOST COMMON WEBSITES ===")
     for i, (website, count) in enumerate(website_counts.most_common(20), 1):
-        percentage = (count / len(websites)) * 100
+        percentage = (count / websites_count) * 100
         print(f"{i:2d}. {website:<50} ({count:2d} schools, {percentage:.1f}%)")
     
     return website_counts
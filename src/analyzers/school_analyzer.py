@@ -8,13 +8,176 @@ to a locally running Ollama model to extract structured information about each s
 
 import json
 import os
+import orjson
 import argparse
 import requests
+from requests.adapters import HTTPAdapter
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
 import re
 
 
+# Fields salvaged from unparseable responses: (result key, JSON field name).
+# Combined into one alternation so the response is scanned once, not once per field.
+_PARTIAL_FIELDS = [
+    ('school_name', 'name'),
+    ('mission', 'mission_statement'),
+    ('enrollment', 'enrollment'),
+    ('grades', 'grades_served'),
+    ('phone', 'phone'),
+    ('email', 'primary_email'),
+]
+_PARTIAL_RE = re.compile('|'.join(
+    rf'"{field}":\s*"(?P<{key}>[^"]+)"' for key, field in _PARTIAL_FIELDS
+))
+
+_WS_RUN = re.compile(r'\s+')
+
+# Row layout of the Parquet results file; nested dicts are stored as JSON text
+_PARQUET_SCHEMA = pa.schema([
+    ('school_name', pa.string()),
+    ('file', pa.string()),
+    ('success', pa.bool_()),
+    ('error', pa.string()),
+    ('model_used', pa.string()),
+    ('school_info_json', pa.string()),
+    ('analysis_json', pa.string()),
+    ('partial_info_json', pa.string()),
+    ('raw_response', pa.string()),
+])
+_PARQUET_BATCH = 25  # rows per row group; one row per group bloats the file
+
+# Analysis template sections: (section name, source fields, JSON snippet).
+# A section is dropped from the prompt when none of its source fields has data
+# in school_info or any scraped page; an empty field tuple means always keep it.
+_PROMPT_SECTIONS = [
+    ('school_summary', (), """  "school_summary": {
+    "name": "School name",
+    "type": "Charter school type (e.g., K-12, High School, Middle School)",
+    "mission_statement": "Extracted mission statement or core purpose",
+    "founded_year": "Year founded if mentioned",
+    "enrollment": "Number of students if mentioned",
+    "grades_served": "Grade levels served (e.g., K-5, 6-12)"
+  }"""),
+    ('academic_programs', ('text_content',), """  "academic_programs": {
+    "special_programs": ["List of special programs, academies, or tracks"],
+    "curriculum_focus": "Main curriculum focus or approach",
+    "college_prep": "College preparation programs or statistics",
+    "extracurriculars": ["List of extracurricular activities mentioned"]
+  }"""),
+    ('contact_info', ('email', 'website', 'text_content'), """  "contact_info": {
+    "primary_email": "Main contact email",
+    "phone": "Phone number if found",
+    "address": "Physical address if found",
+    "social_media": ["Social media links found"]
+  }"""),
+    ('key_features', ('text_content', 'description'), """  "key_features": {
+    "unique_selling_points": ["What makes this school unique"],
+    "awards_recognition": ["Awards, recognitions, or achievements mentioned"],
+    "partnerships": ["Community or business partnerships mentioned"]
+  }"""),
+    ('enrollment_info', ('text_content',), """  "enrollment_info": {
+    "enrollment_process": "How to enroll or apply",
+    "deadlines": "Application deadlines if mentioned",
+    "requirements": "Enrollment requirements if mentioned"
+  }"""),
+    ('analysis_notes', (), """  "analysis_notes": {
+    "data_quality": "Assessment of available information quality",
+    "missing_info": ["Important information that seems to be missing"],
+    "confidence_level": "High/Medium/Low - confidence in the analysis"
+  }"""),
+]
+
+# Overall cap on the context handed to the model (characters, ~32 KB)
+MAX_CONTEXT_CHARS = 32_000
+
+
+class _JsonScanner:
+    """
+    Incremental brace-depth tracker for the first JSON object in a text stream.
+    
+    Respects string quoting and escapes, so braces inside values don't count.
+    Text before the first '{' is ignored. State carries across feed() calls.
+    """
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_str = False
+        self.esc = False
+        self.started = False
+    
+    def feed(self, text: str, start: int = 0) -> int:
+        """Return the index just past the object's closing brace, or -1."""
+        for i in range(start, len(text)):
+            c = text[i]
+            if not self.started:
+                if c != '{':
+                    continue
+                self.started = True
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif c == '\\':
+                    self.esc = True
+                elif c == '"':
+                    self.in_str = False
+            elif c == '"':
+                self.in_str = True
+            elif c == '{':
+                self.depth += 1
+            elif c == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+
+def _find_json(text: str) -> Optional[str]:
+    """
+    Return the first complete JSON object in text using a single forward scan.
+    
+    If the text ends before the object closes (a truncated reply), the missing
+    closing braces are appended.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    scanner = _JsonScanner()
+    end = scanner.feed(text, start)
+    if end != -1:
+        return text[start:end]
+    if scanner.in_str:
+        return text[start:]
+    return text[start:] + '}' * scanner.depth
+
+
+def _json_text(value: Any) -> Optional[str]:
+    """Serialize a nested value for a Parquet string column."""
+    if value is None:
+        return None
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _parquet_row(school_name: str, entry: Dict[str, Any], success: bool) -> Dict[str, Any]:
+    """Flatten one results entry into a row matching _PARQUET_SCHEMA."""
+    result = entry.get('analysis_result', {})
+    return {
+        'school_name': school_name,
+        'file': entry.get('file'),
+        'success': success,
+        'error': result.get('error', entry.get('error')),
+        'model_used': result.get('model_used'),
+        'school_info_json': _json_text(entry.get('school_info')),
+        'analysis_json': _json_text(result.get('analysis')),
+        'partial_info_json': _json_text(result.get('partial_info')),
+        'raw_response': result.get('raw_response'),
+    }
+
+
 class SchoolAnalyzer:
     """Analyzes school data using Ollama LLM."""
     
@@ -30,10 +193,16 @@ class SchoolAnalyzer:
         self.model = model
         self.api_url = f"{ollama_url}/api/generate"
         
+        # Keep-alive connections to Ollama, sized for the worker pool
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        
     def check_ollama_connection(self) -> bool:
         """Check if Ollama is running and accessible."""
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.ollama_url}/api/tags", timeout=5)
             return response.status_code == 200
         except requests.exceptions.RequestException:
             return False
@@ -41,7 +210,7 @@ class SchoolAnalyzer:
     def get_available_models(self) -> List[str]:
         """Get list of available models from Ollama."""
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags")
+            response = self._session.get(f"{self.ollama_url}/api/tags")
             if response.status_code == 200:
                 data = response.json()
                 return [model['name'] for model in data.get('models', [])]
@@ -62,7 +231,7 @@ class SchoolAnalyzer:
         school_info = school_data.get('school_info', {})
         pages = school_data.get('pages', {})
         
-        context = f"""
+        parts = [f"""
 SCHOOL INFORMATION:
 - Name: {school_info.get('school_name', 'N/A')}
 - CDS Code: {school_info.get('cds_code', 'N/A')}
@@ -73,7 +242,8 @@ SCHOOL INFORMATION:
 - Domain: {school_info.get('domain', 'N/A')}
 
 SCRAPED PAGES ({len(pages)} total):
-"""
+"""]
+        used = len(parts[0])
         
         for url, page_data in pages.items():
             page_type = page_data.get('page_type', 'unknown')
@@ -85,39 +255,76 @@ SCRAPED PAGES ({len(pages)} total):
             if len(text_content) > 2000:
                 text_content = text_content[:2000] + "... [truncated]"
             
-            context += f"""
+            part = f"""
 --- PAGE: {url} ({page_type.upper()}) ---
 Title: {title}
 Description: {description}
 Content: {text_content}
 
 """
+            parts.append(part)
+            used += len(part)
+            # Keep the whole prompt bounded; tokens are the real cost
+            if used >= MAX_CONTEXT_CHARS:
+                break
         
-        return context.strip()
+        return ''.join(parts).strip()
     
     def _extract_partial_info(self, text: str) -> Dict[str, Any]:
         """Extract partial information from raw response when JSON parsing fails."""
         partial_info = {}
         
-        # Try to extract key information using regex patterns
-        patterns = {
-            'school_name': r'"name":\s*"([^"]+)"',
-            'mission': r'"mission_statement":\s*"([^"]+)"',
-            'enrollment': r'"enrollment":\s*"([^"]+)"',
-            'grades': r'"grades_served":\s*"([^"]+)"',
-            'phone': r'"phone":\s*"([^"]+)"',
-            'email': r'"primary_email":\s*"([^"]+)"'
-        }
-        
-        for key, pattern in patterns.items():
-            match = re.search(pattern, text)
-            if match:
-                partial_info[key] = match.group(1)
+        # Try to extract key information in a single pass; first match per field wins
+        for match in _PARTIAL_RE.finditer(text):
+            partial_info.setdefault(match.lastgroup, match.group(match.lastgroup))
         
         return partial_info
     
-    def create_analysis_prompt(self, school_context: str) -> str:
-        """Create a comprehensive prompt for school analysis."""
+    def _read_streamed_response(self, response: requests.Response) -> str:
+        """
+        Accumulate a streamed Ollama reply.
+        
+        Stops reading as soon as the first JSON object structurally closes
+        (braces inside string values don't count), so nothing the model
+        generates afterwards is waited for.
+        """
+        buf = bytearray()
+        scanner = _JsonScanner()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = orjson.loads(line)
+            piece = chunk.get('response', '')
+            buf += piece.encode('utf-8')
+            if chunk.get('done'):
+                break
+            if scanner.feed(piece) != -1:
+                # Unread body left: close now so Ollama sees the disconnect and
+                # stops generating; the pool opens a fresh connection next time
+                response.close()
+                break
+        return buf.decode('utf-8', errors='replace')
+    
+    def create_analysis_prompt(self, school_context: str,
+                               school_data: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Create a comprehensive prompt for school analysis.
+        
+        When school_data is given, JSON sections whose source fields are empty
+        in both school_info and every scraped page are left out of the template.
+        """
+        sections = _PROMPT_SECTIONS
+        if school_data is not None:
+            school_info = school_data.get('school_info', {})
+            pages = school_data.get('pages', {}).values()
+            sections = [
+                section for section in _PROMPT_SECTIONS
+                if not section[1] or any(
+                    school_info.get(f) or any(page.get(f) for page in pages)
+                    for f in section[1]
+                )
+            ]
+        schema = ',\n'.join(snippet for _, _, snippet in sections)
         return f"""
 You are an expert education analyst. Analyze the following charter school data and extract key information in a structured format.
 
@@ -126,41 +333,7 @@ You are an expert education analyst. Analyze the following charter school data a
 Please provide a comprehensive analysis in the following JSON format:
 
 {{
-  "school_summary": {{
-    "name": "School name",
-    "type": "Charter school type (e.g., K-12, High School, Middle School)",
-    "mission_statement": "Extracted mission statement or core purpose",
-    "founded_year": "Year founded if mentioned",
-    "enrollment": "Number of students if mentioned",
-    "grades_served": "Grade levels served (e.g., K-5, 6-12)"
-  }},
-  "academic_programs": {{
-    "special_programs": ["List of special programs, academies, or tracks"],
-    "curriculum_focus": "Main curriculum focus or approach",
-    "college_prep": "College preparation programs or statistics",
-    "extracurriculars": ["List of extracurricular activities mentioned"]
-  }},
-  "contact_info": {{
-    "primary_email": "Main contact email",
-    "phone": "Phone number if found",
-    "address": "Physical address if found",
-    "social_media": ["Social media links found"]
-  }},
-  "key_features": {{
-    "unique_selling_points": ["What makes this school unique"],
-    "awards_recognition": ["Awards, recognitions, or achievements mentioned"],
-    "partnerships": ["Community or business partnerships mentioned"]
-  }},
-  "enrollment_info": {{
-    "enrollment_process": "How to enroll or apply",
-    "deadlines": "Application deadlines if mentioned",
-    "requirements": "Enrollment requirements if mentioned"
-  }},
-  "analysis_notes": {{
-    "data_quality": "Assessment of available information quality",
-    "missing_info": ["Important information that seems to be missing"],
-    "confidence_level": "High/Medium/Low - confidence in the analysis"
-  }}
+{schema}
 }}
 
 Focus on extracting factual information from the content. If information is not available, use "Not specified" or empty arrays as appropriate. Be thorough but concise.
@@ -177,26 +350,25 @@ Focus on extracting factual information from the content. If information is not
             Analysis results
         """
         school_context = self.prepare_school_context(school_data)
-        prompt = self.create_analysis_prompt(school_context)
+        prompt = self.create_analysis_prompt(school_context, school_data)
         
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": True,
             "options": {
                 "temperature": 0.1,  # Low temperature for more consistent results
                 "top_p": 0.9,
-                "max_tokens": 4000
+                # Ollama reads num_predict; the old max_tokens key was ignored
+                "num_predict": 4000
             }
         }
         
         try:
             print(f"🤖 Analyzing {school_data.get('school_info', {}).get('school_name', 'Unknown School')}...")
-            response = requests.post(self.api_url, json=payload, timeout=120)
-            response.raise_for_status()
-            
-            result = response.json()
-            analysis_text = result.get('response', '')
+            with self._session.post(self.api_url, json=payload, stream=True, timeout=120) as response:
+                response.raise_for_status()
+                analysis_text = self._read_streamed_response(response)
             
             # Try to extract JSON from the response
             try:
@@ -209,20 +381,16 @@ Focus on extracting factual information from the content. If information is not
                 elif '```' in analysis_text:
                     analysis_text = analysis_text.split('```')[1].split('```')[0]
                 
-                # Look for JSON in the response
-                json_match = re.search(r'\{.*\}', analysis_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group()
-                    
-                    # Try to fix common JSON issues
-                    json_str = json_str.replace('\n', ' ').replace('\r', ' ')
-                    json_str = re.sub(r'\s+', ' ', json_str)  # Normalize whitespace
-                    
-                    # Try to complete truncated JSON
-                    if json_str.count('{') > json_str.count('}'):
-                        json_str += '}' * (json_str.count('{') - json_str.count('}'))
-                    
-                    analysis_json = json.loads(json_str)
+                # Look for the first JSON object in the response
+                json_str = _find_json(analysis_text)
+                if json_str:
+                    try:
+                        analysis_json = orjson.loads(json_str)
+                    except orjson.JSONDecodeError:
+                        # Raw newlines inside string values are invalid JSON;
+                        # only pay for the cleanup when the first parse fails
+                        json_str = _WS_RUN.sub(' ', json_str)
+                        analysis_json = orjson.loads(json_str)
                     return {
                         'success': True,
                         'analysis': analysis_json,
@@ -236,7 +404,7 @@ Focus on extracting factual information from the content. If information is not
                         'raw_response': analysis_text,
                         'model_used': self.model
                     }
-            except json.JSONDecodeError as e:
+            except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
                 # Try to extract partial information from the raw response
                 partial_info = self._extract_partial_info(analysis_text)
                 return {
@@ -255,22 +423,64 @@ Focus on extracting factual information from the content. If information is not
                 'model_used': self.model
             }
     
-    def analyze_schools_from_directory(self, data_dir: str, output_file: Optional[str] = None) -> Dict[str, Any]:
+    def _process_one(self, file_path: str, json_file: str) -> Tuple[str, Dict[str, Any], bool]:
+        """
+        Load and analyze one school file (runs on a worker thread).
+        
+        Returns:
+            (school_name, results entry, success flag)
+        """
+        school_name = json_file.replace('.json', '')
+        
+        try:
+            with open(file_path, 'rb') as f:
+                school_data = orjson.loads(f.read())
+            
+            analysis_result = self.analyze_school(school_data)
+            entry = {
+                'file': json_file,
+                'school_info': school_data.get('school_info', {}),
+                'analysis_result': analysis_result
+            }
+            
+            if analysis_result['success']:
+                print(f"  ✅ {school_name}")
+                return school_name, entry, True
+            print(f"  ❌ {school_name}: {analysis_result.get('error', 'Unknown error')}")
+            return school_name, entry, False
+                
+        except Exception as e:
+            print(f"  ❌ {school_name}: Failed to process file - {str(e)}")
+            return school_name, {'file': json_file, 'error': str(e)}, False
+    
+    def analyze_schools_from_directory(self, data_dir: str, output_file: Optional[str] = None,
+                                       concurrency: int = 4,
+                                       output_format: str = 'parquet') -> Dict[str, Any]:
         """
         Analyze all schools in a directory.
         
+        With output_format='parquet' each finished school is written to the
+        output file as it completes and is not kept in results['schools'];
+        'json' keeps every entry in memory and dumps one document at the end.
+        
         Args:
             data_dir: Directory containing school JSON files
             output_file: Optional output file for results
+            concurrency: Number of Ollama requests kept in flight
+            output_format: 'parquet' or 'json'
             
         Returns:
-            Analysis results for all schools
+            Analysis results for all schools. When Parquet rows are streamed to
+            output_file, results['schools'] is empty and only 'metadata' is
+            filled in; read the per-school data back from the Parquet file.
         """
-        if not os.path.exists(data_dir):
-            raise FileNotFoundError(f"Directory not found: {data_dir}")
-        
-        # Find all JSON files (excluding summary CSV)
-        json_files = [f for f in os.listdir(data_dir) if f.endswith('.json')]
+        # Find all JSON files (excluding summary CSV); one scandir pass, no per-file stat
+        try:
+            with os.scandir(data_dir) as it:
+                json_entries = [e for e in it if e.name.endswith('.json') and e.is_file()]
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Directory not found: {data_dir}") from None
+        json_files = [e.name for e in json_entries]
         
         if not json_files:
             raise ValueError(f"No JSON files found in {data_dir}")
@@ -290,45 +500,55 @@ Focus on extracting factual information from the content. If information is not
         successful_analyses = 0
         failed_analyses = 0
         
-        for json_file in json_files:
-            file_path = os.path.join(data_dir, json_file)
-            school_name = json_file.replace('.json', '')
+        # Each file is an independent, I/O-bound Ollama request, so run several at once.
+        # Results are collected on this thread, so the counters need no locking.
+        entries = {}
+        streaming = bool(output_file) and output_format == 'parquet'
+        writer = pq.ParquetWriter(output_file, _PARQUET_SCHEMA, compression='zstd') if streaming else None
+        pending = []
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = {executor.submit(self._process_one, e.path, e.name): e.name
+                           for e in json_entries}
+                for future in as_completed(futures):
+                    school_name, entry, success = future.result()
+                    if success:
+                        successful_analyses += 1
+                    else:
+                        failed_analyses += 1
+                    if writer is None:
+                        entries[school_name] = entry
+                        continue
+                    pending.append(_parquet_row(school_name, entry, success))
+                    if len(pending) >= _PARQUET_BATCH:
+                        writer.write_table(pa.Table.from_pylist(pending, schema=_PARQUET_SCHEMA))
+                        pending.clear()
             
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    school_data = json.load(f)
-                
-                analysis_result = self.analyze_school(school_data)
-                
-                results['schools'][school_name] = {
-                    'file': json_file,
-                    'school_info': school_data.get('school_info', {}),
-                    'analysis_result': analysis_result
-                }
-                
-                if analysis_result['success']:
-                    successful_analyses += 1
-                    print(f"  ✅ {school_name}")
-                else:
-                    failed_analyses += 1
-                    print(f"  ❌ {school_name}: {analysis_result.get('error', 'Unknown error')}")
-                    
-            except Exception as e:
-                failed_analyses += 1
-                print(f"  ❌ {school_name}: Failed to process file - {str(e)}")
-                results['schools'][school_name] = {
-                    'file': json_file,
-                    'error': str(e)
-                }
+            results['metadata']['successful_analyses'] = successful_analyses
+            results['metadata']['failed_analyses'] = failed_analyses
+            results['metadata']['success_rate'] = successful_analyses / len(json_files) * 100
+            
+            if writer is not None:
+                if pending:
+                    writer.write_table(pa.Table.from_pylist(pending, schema=_PARQUET_SCHEMA))
+                writer.add_key_value_metadata({'metadata': orjson.dumps(results['metadata'])})
+        finally:
+            if writer is not None:
+                writer.close()
+        
+        if writer is not None:
+            print(f"💾 Results saved to: {output_file}")
+            return results
         
-        results['metadata']['successful_analyses'] = successful_analyses
-        results['metadata']['failed_analyses'] = failed_analyses
-        results['metadata']['success_rate'] = successful_analyses / len(json_files) * 100
+        # Keep the output in directory-listing order rather than completion order
+        for json_file in json_files:
+            school_name = json_file.replace('.json', '')
+            results['schools'][school_name] = entries[school_name]
         
         # Save results if output file specified
         if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             print(f"💾 Results saved to: {output_file}")
         
         return results
@@ -340,16 +560,30 @@ def main():
     parser.add_argument('--data-dir', default='test_scraped_data',
                        help='Directory containing school JSON files')
     parser.add_argument('--output', default=None,
-                       help='Output file for analysis results (JSON)')
+                       help='Output file for analysis results')
+    parser.add_argument('--format', dest='output_format', choices=['parquet', 'json'], default=None,
+                       help='Output format: Parquet rows written as schools finish, or one JSON document '
+                            '(default: from the --output extension, else parquet)')
     parser.add_argument('--ollama-url', default='http://localhost:11434',
                        help='Ollama server URL')
     parser.add_argument('--model', default='llama3.1',
                        help='Ollama model to use')
     parser.add_argument('--check-connection', action='store_true',
                        help='Check Ollama connection and available models')
+    parser.add_argument('--concurrency', type=int, default=4,
+                       help='Number of schools analyzed in parallel (set OLLAMA_NUM_PARALLEL to match)')
     
     args = parser.parse_args()
     
+    # Infer the format from the output extension so results.json is never Parquet
+    suffix = Path(args.output).suffix.lower().lstrip('.') if args.output else ''
+    if suffix in ('parquet', 'json'):
+        if args.output_format and args.output_format != suffix:
+            parser.error(f"--format {args.output_format} does not match --output {args.output}")
+        args.output_format = suffix
+    elif not args.output_format:
+        args.output_format = 'parquet'
+    
     print("🎓 School Data Analyzer with Ollama")
     print(f"🔗 Ollama URL: {args.ollama_url}")
     print(f"🤖 Model: {args.model}")
@@ -385,11 +619,13 @@ def main():
     # Generate output filename if not provided
     if not args.output:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        args.output = str(default_output_dir / f"school_analysis_{timestamp}.json")
+        default_output_dir.mkdir(parents=True, exist_ok=True)
+        args.output = str(default_output_dir / f"school_analysis_{timestamp}.{args.output_format}")
     
     try:
         print(f"\n📊 Analyzing schools in: {args.data_dir}")
-        results = analyzer.analyze_schools_from_directory(args.data_dir, args.output)
+        results = analyzer.analyze_schools_from_directory(args.data_dir, args.output, args.concurrency,
+                                                          args.output_format)
         
         print(f"\n📈 Analysis Summary:")
         print(f"   🏫 Total schools: {results['metadata']['total_schools']}")
@@ -6,13 +6,42 @@ This script provides a more focused analysis with shorter prompts to avoid
 JSON parsing issues with smaller models.
 """
 
-import json
+import asyncio
 import os
+import orjson
 import argparse
+import aiohttp
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import re
+from bisect import bisect_right
+from itertools import islice
+
+# Rough token estimate: each word or punctuation mark counts as one token. BPE
+# vocabularies split some long words further, so this slightly undercounts,
+# but it is close enough to bound prefill without shipping a tokenizer.
+_TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+PROMPT_CONTENT_TOKENS = 400
+# Upper token bounds of the prompt-length bins dispatched as separate batches
+PROMPT_BINS = (300, 600)
+# Threads that read and parse school files in parallel
+READ_WORKERS = 4
+
+
+def trim_to_tokens(text: str, max_tokens: int = PROMPT_CONTENT_TOKENS) -> str:
+    """Cut text after roughly max_tokens tokens."""
+    last = None
+    for last in islice(_TOKEN_RE.finditer(text), max_tokens - 1, max_tokens):
+        pass
+    return text[:last.end()] if last else text
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    """Read and parse one school file (runs on the read pool)."""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
 
 
 class SimpleSchoolAnalyzer:
@@ -23,8 +52,8 @@ class SimpleSchoolAnalyzer:
         self.model = model
         self.api_url = f"{ollama_url}/api/generate"
     
-    def analyze_school_simple(self, school_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Simple analysis with focused prompts."""
+    def build_prompt(self, school_data: Dict[str, Any]) -> str:
+        """Build the focused analysis prompt for one school."""
         school_info = school_data.get('school_info', {})
         pages = school_data.get('pages', {})
         
@@ -39,13 +68,13 @@ class SimpleSchoolAnalyzer:
             home_page = list(pages.values())[0] if pages else {}
         
         # Create simple prompt
-        prompt = f"""
+        return f"""
 Analyze this charter school and provide key information:
 
 School: {school_info.get('school_name', 'Unknown')}
 Website: {school_info.get('website', 'Unknown')}
 
-Main content: {home_page.get('text_content', '')[:1500]}
+Main content: {trim_to_tokens(home_page.get('text_content', ''))}
 
 Provide a brief analysis in this format:
 - Mission: [mission statement or purpose]
@@ -56,16 +85,25 @@ Provide a brief analysis in this format:
 
 Keep it concise and factual.
 """
-        
-        payload = {
+    
+    def build_payload(self, prompt: str) -> Dict[str, Any]:
+        """Build the /api/generate request body."""
+        return {
             "model": self.model,
             "prompt": prompt,
             "stream": False,
             "options": {
                 "temperature": 0.1,
-                "max_tokens": 1000
+                # Ollama reads num_predict; the old max_tokens key was ignored
+                "num_predict": 256,
+                "num_ctx": 2048
             }
         }
+    
+    def analyze_school_simple(self, school_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Simple analysis with focused prompts."""
+        school_info = school_data.get('school_info', {})
+        payload = self.build_payload(self.build_prompt(school_data))
         
         try:
             print(f"🤖 Analyzing {school_info.get('school_name', 'Unknown School')}...")
@@ -90,12 +128,97 @@ Keep it concise and factual.
                 'school_name': school_info.get('school_name', 'Unknown')
             }
     
-    def analyze_schools_simple(self, data_dir: str, output_file: Optional[str] = None) -> Dict[str, Any]:
-        """Analyze all schools in a directory with simple prompts."""
-        if not os.path.exists(data_dir):
-            raise FileNotFoundError(f"Directory not found: {data_dir}")
+    async def analyze_school_async(self, client: aiohttp.ClientSession, sem: asyncio.Semaphore,
+                                   school_data: Dict[str, Any],
+                                   prompt: Optional[str] = None) -> Dict[str, Any]:
+        """Async variant of analyze_school_simple; sem bounds the requests in flight."""
+        school_info = school_data.get('school_info', {})
+        payload = self.build_payload(prompt if prompt is not None else self.build_prompt(school_data))
+        
+        async with sem:
+            try:
+                print(f"🤖 Analyzing {school_info.get('school_name', 'Unknown School')}...")
+                async with client.post(self.api_url, json=payload) as response:
+                    response.raise_for_status()
+                    result = orjson.loads(await response.read())
+                analysis_text = result.get('response', '')
+                
+                return {
+                    'success': True,
+                    'analysis': analysis_text,
+                    'model_used': self.model,
+                    'school_name': school_info.get('school_name', 'Unknown')
+                }
+                    
+            except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+                return {
+                    'success': False,
+                    'error': f'Request failed: {str(e)}',
+                    'model_used': self.model,
+                    'school_name': school_info.get('school_name', 'Unknown')
+                }
+    
+    async def _analyze_all(self, schools: List[Dict[str, Any]], parallel: int) -> List[Dict[str, Any]]:
+        """
+        Send every prompt with up to `parallel` in flight; results keep the input order.
+        
+        Prompts are grouped into length bins and each bin is sent as its own
+        batch, so requests Ollama runs together have similar lengths and a
+        batch doesn't wait on one much longer prompt.
+        """
+        prompts = [self.build_prompt(school_data) for school_data in schools]
+        bins = [[] for _ in range(len(PROMPT_BINS) + 1)]
+        for i, prompt in enumerate(prompts):
+            bins[bisect_right(PROMPT_BINS, len(_TOKEN_RE.findall(prompt)))].append(i)
+        
+        results = [None] * len(schools)
+        sem = asyncio.Semaphore(parallel)
+        timeout = aiohttp.ClientTimeout(total=120)
+        connector = aiohttp.TCPConnector(limit=64)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                         json_serialize=lambda obj: orjson.dumps(obj).decode()) as client:
+            for indices in bins:
+                batch = await asyncio.gather(*(
+                    self.analyze_school_async(client, sem, schools[i], prompts[i]) for i in indices
+                ))
+                for i, result in zip(indices, batch):
+                    results[i] = result
+        return results
+    
+    async def _load_and_analyze(self, json_entries: List[os.DirEntry], parallel: int):
+        """
+        Read and parse the school files on a small thread pool, then analyze them.
         
-        json_files = [f for f in os.listdir(data_dir) if f.endswith('.json')]
+        Returns:
+            (parsed data or the exception raised for each entry,
+             analysis result by file name for the files that loaded)
+        """
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as read_pool:
+            loaded = await asyncio.gather(*(
+                loop.run_in_executor(read_pool, _read_json, entry.path) for entry in json_entries
+            ), return_exceptions=True)
+        
+        ok = [(entry.name, data) for entry, data in zip(json_entries, loaded)
+              if not isinstance(data, Exception)]
+        analyses = await self._analyze_all([data for _, data in ok], parallel)
+        return loaded, {name: result for (name, _), result in zip(ok, analyses)}
+    
+    def analyze_schools_simple(self, data_dir: str, output_file: Optional[str] = None,
+                               parallel: int = 4) -> Dict[str, Any]:
+        """
+        Analyze all schools in a directory with simple prompts.
+        
+        Up to `parallel` prompts are sent at once so Ollama can batch them;
+        the server needs OLLAMA_NUM_PARALLEL >= parallel to actually run them
+        together (e.g. OLLAMA_NUM_PARALLEL=8 OLLAMA_MAX_LOADED_MODELS=1).
+        """
+        try:
+            with os.scandir(data_dir) as it:
+                json_entries = [e for e in it if e.name.endswith('.json') and e.is_file()]
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Directory not found: {data_dir}") from None
+        json_files = [e.name for e in json_entries]
         
         if not json_files:
             raise ValueError(f"No JSON files found in {data_dir}")
@@ -114,44 +237,48 @@ Keep it concise and factual.
         successful_analyses = 0
         failed_analyses = 0
         
-        for json_file in json_files:
-            file_path = os.path.join(data_dir, json_file)
-            school_name = json_file.replace('.json', '')
+        loaded, analysis_results = asyncio.run(self._load_and_analyze(json_entries, parallel))
+        
+        entries = {}
+        for entry, school_data in zip(json_entries, loaded):
+            json_file = entry.name
+            school_name = json_file[:-5]
             
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    school_data = json.load(f)
-                
-                analysis_result = self.analyze_school_simple(school_data)
-                
-                results['schools'][school_name] = {
-                    'file': json_file,
-                    'school_info': school_data.get('school_info', {}),
-                    'analysis_result': analysis_result
-                }
-                
-                if analysis_result['success']:
-                    successful_analyses += 1
-                    print(f"  ✅ {school_name}")
-                else:
-                    failed_analyses += 1
-                    print(f"  ❌ {school_name}: {analysis_result.get('error', 'Unknown error')}")
-                    
-            except Exception as e:
+            if isinstance(school_data, Exception):
                 failed_analyses += 1
-                print(f"  ❌ {school_name}: Failed to process file - {str(e)}")
-                results['schools'][school_name] = {
+                print(f"  ❌ {school_name}: Failed to process file - {str(school_data)}")
+                entries[school_name] = {
                     'file': json_file,
-                    'error': str(e)
+                    'error': str(school_data)
                 }
+                continue
+            
+            analysis_result = analysis_results[json_file]
+            entries[school_name] = {
+                'file': json_file,
+                'school_info': school_data.get('school_info', {}),
+                'analysis_result': analysis_result
+            }
+            
+            if analysis_result['success']:
+                successful_analyses += 1
+                print(f"  ✅ {school_name}")
+            else:
+                failed_analyses += 1
+                print(f"  ❌ {school_name}: {analysis_result.get('error', 'Unknown error')}")
+        
+        # Keep the output in directory-listing order
+        for json_file in json_files:
+            school_name = json_file[:-5]
+            results['schools'][school_name] = entries[school_name]
         
         results['metadata']['successful_analyses'] = successful_analyses
         results['metadata']['failed_analyses'] = failed_analyses
         results['metadata']['success_rate'] = successful_analyses / len(json_files) * 100
         
         if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             print(f"💾 Results saved to: {output_file}")
         
         return results
@@ -175,6 +302,8 @@ def main():
                        help='Ollama server URL')
     parser.add_argument('--model', default='llama3.2:3b',
                        help='Ollama model to use')
+    parser.add_argument('--parallel', type=int, default=4,
+                       help='Prompts sent to Ollama at once (set OLLAMA_NUM_PARALLEL to match)')
     
     args = parser.parse_args()
     
@@ -185,11 +314,12 @@ def main():
     
     if not args.output:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        default_output_dir.mkdir(parents=True, exist_ok=True)
         args.output = str(default_output_dir / f"simple_school_analysis_{timestamp}.json")
     
     try:
         print(f"\n📊 Analyzing schools in: {args.data_dir}")
-        results = analyzer.analyze_schools_simple(args.data_dir, args.output)
+        results = analyzer.analyze_schools_simple(args.data_dir, args.output, args.parallel)
         
         print(f"\n📈 Analysis Summary:")
         print(f"   🏫 Total schools: {results['metadata']['total_schools']}")
@@ -12,18 +12,29 @@ Usage:
   python cde_private_schools_scraper.py
 """
 
+import asyncio
+import logging
 import time
-import json
-import csv
 import math
+import os
+import re
 import sys
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
+from logging.handlers import MemoryHandler
 
+import aiohttp
+import orjson
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html as lxml_html
+from selectolax.lexbor import LexborHTMLParser
+import pyarrow as pa
+import pyarrow.csv as pcsv
 
 BASE = "https://www.cde.ca.gov"
 
@@ -34,16 +45,19 @@ BASE = "https://www.cde.ca.gov"
 # 2. PUBLIC CHARTER SCHOOLS (1,262 schools across 3 pages) - CURRENTLY ACTIVE
 LIST_URL = BASE + "/SchoolDirectory/Results?title=California%20School%20Directory&search=1&status=1%2C2&types=0&nps=0&multilingual=0&charter=1&magnet=0&yearround=0&qdc=0&qsc=0&sax=True&tab=1&order=0&page={page}&items=500&hidecriteria=False&isstaticreport=False"
 
-DETAILS_URL = BASE + "/SchoolDirectory/details?cdscode={cds}"
+DETAILS_PATH = "/SchoolDirectory/details"
+DETAILS_URL = BASE + DETAILS_PATH + "?cdscode={cds}"
+# School-column links are site-relative in practice; accept the absolute form too
+_DETAILS_PREFIXES = (DETAILS_PATH, BASE + DETAILS_PATH)
 
 # Generate unique filenames with timestamp
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 # File naming patterns:
-# PRIVATE SCHOOLS: schools_full_{timestamp}.csv, schools_checkpoint_{timestamp}.json
-# PUBLIC CHARTER SCHOOLS: schools_charter_{timestamp}.csv, schools_charter_checkpoint_{timestamp}.json
+# PRIVATE SCHOOLS: schools_full_{timestamp}.csv, schools_checkpoint_{timestamp}.jsonl
+# PUBLIC CHARTER SCHOOLS: schools_charter_{timestamp}.csv, schools_charter_checkpoint_{timestamp}.jsonl
 OUT_CSV = Path(f"schools_charter_{timestamp}.csv")
 OUT_JSONL = Path(f"schools_charter_{timestamp}.jsonl")
-CHECKPOINT = Path(f"schools_charter_checkpoint_{timestamp}.json")
+CHECKPOINT = Path(f"schools_charter_checkpoint_{timestamp}.jsonl")  # append-only, one {cds: details} per line
 
 # ---- Settings you can tweak ----
 # Page ranges for different school types:
@@ -53,8 +67,7 @@ PAGES = list(range(0, 3))  # Currently set for charter schools
 REQUESTS_TIMEOUT = 30
 RETRY_TIMES = 4
 SLEEP_BETWEEN = 2.0      # polite delay between requests (seconds)
-SLEEP_BETWEEN_PAGES = 5  # extra pause per list page
-MAX_WORKERS = 6          # used only if you enable parallel detail fetch (see comment below)
+MAX_WORKERS = 8          # concurrent details-page fetches (each still sleeps SLEEP_BETWEEN)
 # --------------------------------
 
 session = requests.Session()
@@ -62,7 +75,7 @@ session.headers.update({
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
     "Accept-Language": "en-US,en;q=0.9",
-    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Encoding": "gzip, deflate, br",  # br is only decoded when brotli is installed
     "DNT": "1",
     "Connection": "keep-alive",
     "Upgrade-Insecure-Requests": "1",
@@ -71,70 +84,119 @@ session.headers.update({
     "Sec-Fetch-Site": "none",
     "Cache-Control": "max-age=0"
 })
+# Keep TCP+TLS connections to the CDE host alive across requests; urllib3 retries
+# rate-limit/5xx responses with exponential backoff and honors Retry-After.
+adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=RETRY_TIMES, backoff_factor=1.5, status_forcelist=[429, 502, 503, 504]),
+)
+session.mount("https://", adapter)
+
+# Console output is buffered and written in batches of 100 lines instead of one
+# write per print(); warnings and above flush the buffer immediately.
+logger = logging.getLogger("cde_scraper")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_console = logging.StreamHandler(sys.stdout)
+_console.setFormatter(logging.Formatter("%(message)s"))
+console_buffer = MemoryHandler(capacity=100, flushLevel=logging.WARNING, target=_console)
+logger.addHandler(console_buffer)
+
+CAPTCHA_MARKERS = (b"Radware Captcha Page", b"We apologize for the inconvenience")
+
+def is_captcha(body: bytes) -> bool:
+    return any(marker in body for marker in CAPTCHA_MARKERS)
+
+def warn_captcha(url: str):
+    logger.warning(f"⚠️  CAPTCHA detected on {url}")
+    logger.warning("   Bot protection is active. Consider:")
+    logger.warning("   - Increasing delays between requests")
+    logger.warning("   - Using a different IP/VPN")
+    logger.warning("   - Running the script in smaller batches")
 
 def fetch(url: str, allow_redirects=True) -> Optional[requests.Response]:
-    """GET with basic retries and polite delay."""
+    """GET through the pooled session; retries/backoff are handled by the mounted adapter."""
+    try:
+        resp = session.get(url, timeout=REQUESTS_TIMEOUT, allow_redirects=allow_redirects)
+    except requests.RequestException as e:
+        logger.info(f"   Giving up after {RETRY_TIMES} retries (error: {e})")
+        return None
+    # Treat 200 only as success
+    if resp.status_code != 200:
+        logger.info(f"   Giving up (status: {resp.status_code})")
+        return None
+    # Check for captcha page
+    if is_captcha(resp.content):
+        warn_captcha(url)
+        return None
+    return resp
+
+async def fetch_async(client: aiohttp.ClientSession, url: str) -> Optional[bytes]:
+    """Async GET with the same retries/backoff as fetch(); returns the body bytes."""
+    timeout = aiohttp.ClientTimeout(total=REQUESTS_TIMEOUT)
     for i in range(RETRY_TIMES):
+        backoff = 1.5 * (i + 1)
         try:
-            resp = session.get(url, timeout=REQUESTS_TIMEOUT, allow_redirects=allow_redirects)
-            # Treat 200 only as success
-            if resp.status_code == 200:
-                # Check for captcha page
-                if "Radware Captcha Page" in resp.text or "We apologize for the inconvenience" in resp.text:
-                    print(f"⚠️  CAPTCHA detected on {url}")
-                    print("   Bot protection is active. Consider:")
-                    print("   - Increasing delays between requests")
-                    print("   - Using a different IP/VPN")
-                    print("   - Running the script in smaller batches")
+            async with client.get(url, timeout=timeout) as resp:
+                body = await resp.read()
+                status = resp.status
+            if status == 200:
+                if is_captcha(body):
+                    warn_captcha(url)
                     return None
-                return resp
-            # Some servers rate-limit with 429 or 503; short backoff helps
-            backoff = 1.5 * (i + 1)
-            print(f"   Retry {i+1}/{RETRY_TIMES} after {backoff}s (status: {resp.status_code})")
-            time.sleep(backoff)
-        except requests.RequestException as e:
-            backoff = 1.5 * (i + 1)
-            print(f"   Retry {i+1}/{RETRY_TIMES} after {backoff}s (error: {e})")
-            time.sleep(backoff)
+                return body
+            logger.info(f"   Retry {i+1}/{RETRY_TIMES} after {backoff}s (status: {status})")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.info(f"   Retry {i+1}/{RETRY_TIMES} after {backoff}s (error: {e})")
+        await asyncio.sleep(backoff)
     return None
 
+# Whitespace variants collapse to a plain space before the " :" strip...
+_WS_TRANS = str.maketrans({"\xa0": " ", "\n": " ", "\r": " ", "\t": " "})
+# ...then punctuation is mapped in a single pass over the lowercased label.
+_KEY_TRANS = str.maketrans({
+    "/": "_",
+    "&": "and",
+    "(": None,
+    ")": None,
+    ".": None,
+    ",": None,
+    "-": "_",
+})
+_UNDERSCORE_RUN = re.compile(r"__+")
+
+@lru_cache(maxsize=2048)
 def normalize_key(txt: str) -> str:
-    return (
-        txt.strip()
-           .replace(" ", " ")   # non-breaking space
-           .replace("\xa0", " ")
-           .replace("\n", " ")
-           .replace("\r", " ")
-           .replace("\t", " ")
-           .strip(" :")
-           .lower()
-           .replace("/", "_")
-           .replace("&", "and")
-           .replace("(", "")
-           .replace(")", "")
-           .replace(".", "")
-           .replace(",", "")
-           .replace("-", "_")
-           .replace("__", "_")
-    )
+    # Labels repeat on every details page, so the cache hit rate is very high
+    key = txt.strip().translate(_WS_TRANS).strip(" :").lower().translate(_KEY_TRANS)
+    return _UNDERSCORE_RUN.sub("_", key)
+
+_WS = re.compile(r"\s+")
+# CDE pages are UTF-8; without this lxml falls back to latin-1 for bytes lacking a <meta charset>
+_HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
 
 def text_of(el) -> str:
-    if not el:
+    """Whitespace-collapsed text of an lxml element or a selectolax node."""
+    if el is None:
         return ""
-    return " ".join(el.get_text(" ", strip=True).split())
+    # Join text nodes with a space so "foo<br>bar" reads "foo bar"
+    raw = " ".join(el.itertext()) if isinstance(el, lxml_html.HtmlElement) else el.text(separator=" ")
+    return _WS.sub(" ", raw).strip()
 
-def parse_list_page(html: str) -> List[Dict]:
+def parse_list_page(html: bytes) -> List[Dict]:
     """
     Returns a list of dicts with columns shown on the results table + the details URL.
     We rely on the header text to map columns robustly.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    table = soup.find("table")
-    if not table:
+    tree = LexborHTMLParser(html)  # bytes are parsed as UTF-8
+    table = tree.css_first("table")
+    if table is None:
         return []
+    base = BASE  # local lookup inside the per-row loop
 
     # Map headers -> index
-    headers = [text_of(th) for th in table.select("thead th")]
+    headers = [text_of(th) for th in table.css("thead th")]
     # Clean up headers (remove "Sort results by this header" text)
     clean_headers = []
     for h in headers:
@@ -144,9 +206,9 @@ def parse_list_page(html: str) -> List[Dict]:
 
     rows = []
     # Get all tr elements, but skip the header row (first one)
-    all_trs = table.find_all("tr")
+    all_trs = table.css("tr")
     for tr in all_trs[1:]:  # Skip header row
-        tds = tr.find_all("td")
+        tds = tr.css("td")
         if not tds or len(tds) < 5:
             continue
 
@@ -162,13 +224,14 @@ def parse_list_page(html: str) -> List[Dict]:
         school_cell = tds[idx.get("School", 3)] if "School" in idx else (tds[3] if len(tds) > 3 else None)
         school_name = text_of(school_cell)
         details_href = None
-        if school_cell:
-            a = school_cell.find("a", href=True)
-            if a and "SchoolDirectory/details" in a["href"]:
-                details_href = a["href"]
+        if school_cell is not None:
+            a = school_cell.css_first("a[href]")
+            href = (a.attributes.get("href") or "") if a is not None else ""
+            if href.startswith(_DETAILS_PREFIXES):
+                details_href = href
         # Normalize details URL
         if details_href and not details_href.startswith("http"):
-            details_url = BASE + details_href
+            details_url = base + details_href
         elif details_href:
             details_url = details_href
         else:
@@ -193,43 +256,44 @@ def parse_list_page(html: str) -> List[Dict]:
         })
     return rows
 
-def parse_details_page(html: str) -> Dict[str, str]:
+def parse_details_page(html: bytes) -> Dict[str, str]:
     """
     The details page tends to show several tables of label/value rows.
     We greedily collect any TH/TD or first/second TD pairs, plus DL/DT/DD pairs,
     and return a flat dict of normalized keys -> text values.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    try:
+        tree = lxml_html.fromstring(html, parser=_HTML_PARSER)
+    except etree.ParserError:
+        # Blank or comment-only body ("Document is empty")
+        return {}
     info: Dict[str, str] = {}
 
     # Grab mailto if present anywhere
-    email_link = soup.select_one('a[href^="mailto:"]')
-    if email_link:
-        info["email"] = email_link.get("href", "").replace("mailto:", "").strip()
+    mailto = tree.xpath('//a[starts-with(@href, "mailto:")]/@href')
+    if mailto:
+        info["email"] = mailto[0].replace("mailto:", "").strip()
 
     # Tables with two-column label/value
-    for tbl in soup.find_all("table"):
+    for tr in tree.xpath("//table//tr"):
         # Prefer rows with th/td
-        for tr in tbl.find_all("tr"):
-            th = tr.find("th")
-            tds = tr.find_all("td")
-            if th and tds:
-                key = normalize_key(text_of(th))
-                val = text_of(tds[0]) if tds else ""
-                if key and val and key not in info:
-                    info[key] = val
-            elif len(tds) >= 2:
-                key = normalize_key(text_of(tds[0]))
-                val = text_of(tds[1])
-                # avoid swallowing the whole table header row
-                if key and val and len(key) <= 80:
-                    info.setdefault(key, val)
+        th = tr.xpath(".//th")
+        tds = tr.xpath(".//td")
+        if th and tds:
+            key = normalize_key(text_of(th[0]))
+            val = text_of(tds[0])
+            if key and val and key not in info:
+                info[key] = val
+        elif len(tds) >= 2:
+            key = normalize_key(text_of(tds[0]))
+            val = text_of(tds[1])
+            # avoid swallowing the whole table header row
+            if key and val and len(key) <= 80:
+                info.setdefault(key, val)
 
     # Definition lists, if present
-    for dl in soup.find_all("dl"):
-        dts = dl.find_all("dt")
-        dds = dl.find_all("dd")
-        for dt, dd in zip(dts, dds):
+    for dl in tree.xpath("//dl"):
+        for dt, dd in zip(dl.xpath(".//dt"), dl.xpath(".//dd")):
             key = normalize_key(text_of(dt))
             val = text_of(dd)
             if key and val:
@@ -244,16 +308,32 @@ def parse_details_page(html: str) -> Dict[str, str]:
 
     return info
 
+def fetch_list_page(page: int) -> Optional[List[Dict]]:
+    """Fetch and parse one results page (runs on a worker thread)."""
+    url = LIST_URL.format(page=page)
+    logger.info(f"   Fetching page {page}...")
+    resp = fetch(url)
+    if not resp:
+        logger.warning(f"   ❌ Failed list page {page}: {url}")
+        return None
+    return parse_list_page(resp.content)
+
 def load_checkpoint() -> Dict[str, Dict]:
-    if CHECKPOINT.exists():
+    done_map: Dict[str, Dict] = {}
+    if not CHECKPOINT.exists():
+        return done_map
+    # One read of the raw bytes; orjson parses each line without a str decode
+    for line in CHECKPOINT.read_bytes().splitlines():
         try:
-            return json.loads(CHECKPOINT.read_text())
-        except Exception:
-            return {}
-    return {}
+            done_map.update(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            # a truncated last line from an interrupted run; the school is simply refetched
+            continue
+    return done_map
 
-def save_checkpoint(done_map: Dict[str, Dict]):
-    CHECKPOINT.write_text(json.dumps(done_map, indent=2))
+def append_checkpoint(ckpt, cds: str, details: Dict):
+    ckpt.write(orjson.dumps({cds: details}))
+    ckpt.write(b"\n")
 
 def merge_dicts(base: Dict, extra: Dict) -> Dict:
     out = dict(base)
@@ -265,45 +345,132 @@ def merge_dicts(base: Dict, extra: Dict) -> Dict:
             out[k] = v
     return out
 
+async def fetch_all_details(rows: List[Dict], done_map: Dict[str, Dict], log_file: Path,
+                            start_time: float) -> List[Dict]:
+    """
+    Fetch details pages concurrently (at most MAX_WORKERS in flight).
+    Fetchers push results onto a queue; a single writer task owns done_map,
+    the log file and the checkpoint, so none of them need locking.
+    Returns the merged records in the original row order.
+    """
+    total = len(rows)
+    sem = asyncio.BoundedSemaphore(MAX_WORKERS)
+    queue: asyncio.Queue = asyncio.Queue()
+    out_records: List[Optional[Dict]] = [None] * total
+
+    # Cached rows never touch the network: resolve them up front and log them in one write
+    pending: List[Tuple[int, Dict, str]] = []
+    cached_log: List[str] = []
+    for i, row in enumerate(rows, 1):
+        cds = row.get("cds_code", f"row_{i}")
+        if cds in done_map:
+            out_records[i - 1] = merge_dicts(row, done_map[cds])
+            cached_log.append(f"[{i:4d}/{total}] SKIPPED (cached): {cds} {row.get('school', 'Unknown')[:50]}\n")
+        else:
+            pending.append((i, row, cds))
+    if cached_log:
+        with log_file.open("a", encoding="utf-8") as log:
+            log.write("".join(cached_log))
+            log.write("\n")
+        logger.info(f"   ⏭️  Skipped {len(cached_log)} cached schools")
+    to_fetch = len(pending)
+
+    async def bounded_fetch(client: aiohttp.ClientSession, i: int, row: Dict, cds: str):
+        async with sem:
+            await asyncio.sleep(SLEEP_BETWEEN)
+            body = await fetch_async(client, row["details_url"])
+        details = parse_details_page(body) if body else None
+        await queue.put((i, row, cds, details))
+
+    async def writer():
+        with CHECKPOINT.open("ab") as ckpt, log_file.open("a", encoding="utf-8") as log:
+            for n in range(1, to_fetch + 1):
+                i, row, cds, details = await queue.get()
+                school_name = row.get("school", "Unknown")[:50]  # Truncate long names
+
+                # Log the URL being processed
+                log.write(f"[{i:4d}/{total}] Processing: {school_name}\n")
+                log.write(f"  CDS Code: {cds}\n")
+                log.write(f"  URL: {row['details_url']}\n")
+
+                if details is None:
+                    logger.warning(f"   [{i:4d}/{total}] ❌ Failed: {school_name}")
+                    details = {}
+                    log.write(f"  Status: FAILED\n\n")
+                    # If we hit captcha, save what we have and suggest stopping
+                    if n > 1 and n % 10 == 0:  # Check every 10 failures
+                        logger.warning(f"   ⚠️  Multiple failures detected. Consider stopping and resuming later.")
+                else:
+                    logger.info(f"   [{i:4d}/{total}] ✅ Fetched: {school_name}")
+                    log.write(f"  Status: SUCCESS\n")
+                    log.write(f"  Details found: {len(details)} fields\n\n")
+
+                done_map[cds] = details
+                append_checkpoint(ckpt, cds, details)
+                out_records[i - 1] = merge_dicts(row, details)
+
+                # Sync checkpoint to disk every 25 (more frequent)
+                if n % 25 == 0:
+                    ckpt.flush()
+                    os.fsync(ckpt.fileno())
+                    log.flush()
+                    console_buffer.flush()
+                    elapsed = time.time() - start_time
+                    rate = n / elapsed if elapsed > 0 else 0
+                    eta = (to_fetch - n) / rate if rate > 0 else 0
+                    logger.info(f"   💾 Checkpoint saved: {n}/{to_fetch} ({rate:.1f} schools/sec, ETA: {eta/60:.1f}min)")
+
+    connector = aiohttp.TCPConnector(limit_per_host=MAX_WORKERS)
+    async with aiohttp.ClientSession(headers=dict(session.headers), connector=connector) as client:
+        await asyncio.gather(
+            writer(),
+            *[bounded_fetch(client, i, row, cds) for i, row, cds in pending],
+        )
+
+    return out_records
+
 def main():
-    print(f"🚀 Starting CDE Public Charter Schools Scraper")
-    print(f"📁 Output files: {OUT_CSV.name}, {OUT_JSONL.name}")
-    print(f"💾 Checkpoint file: {CHECKPOINT.name}")
-    print(f"📊 Processing {len(PAGES)} pages (pages {PAGES[0]}-{PAGES[-1]})")
-    print("=" * 60)
+    logger.info(f"🚀 Starting CDE Public Charter Schools Scraper")
+    logger.info(f"📁 Output files: {OUT_CSV.name}, {OUT_JSONL.name}")
+    logger.info(f"💾 Checkpoint file: {CHECKPOINT.name}")
+    logger.info(f"📊 Processing {len(PAGES)} pages (pages {PAGES[0]}-{PAGES[-1]})")
+    logger.info("=" * 60)
     
-    print("📋 Fetching list pages…")
-    all_rows: List[Dict] = []
-    for i, p in enumerate(PAGES, 1):
-        url = LIST_URL.format(page=p)
-        print(f"   [{i}/{len(PAGES)}] Fetching page {p}...")
-        resp = fetch(url)
-        if not resp:
-            print(f"   ❌ Failed list page {p}: {url}")
-            continue
-        rows = parse_list_page(resp.text)
-        print(f"   ✅ Page {p}: found {len(rows)} schools")
-        all_rows.extend(rows)
-        time.sleep(SLEEP_BETWEEN_PAGES)
-
-    if not all_rows:
-        print("❌ No rows found. Exiting.")
+    logger.info("📋 Fetching list pages…")
+    # List pages are independent, so fetch them all at once instead of page-by-page
+    pages_rows: Dict[int, List[Dict]] = {}
+    with ThreadPoolExecutor(max_workers=len(PAGES)) as ex:
+        futures = {ex.submit(fetch_list_page, p): p for p in PAGES}
+        for fut in as_completed(futures):
+            p = futures[fut]
+            page_rows = fut.result()
+            if page_rows is None:
+                continue
+            logger.info(f"   ✅ Page {p}: found {len(page_rows)} schools")
+            pages_rows[p] = page_rows
+
+    # Deduplicate by CDS code (some rows could repeat across pages if filters change).
+    # Walk pages in order so the row order doesn't depend on which fetch finished first.
+    seen: set = set()
+    rows: List[Dict] = []
+    for p in PAGES:
+        for r in pages_rows.get(p, []):
+            key = r.get("cds_code") or r.get("details_url")
+            if key not in seen:
+                seen.add(key)
+                rows.append(r)
+
+    if not rows:
+        logger.warning("❌ No rows found. Exiting.")
         return
 
-    # Deduplicate by CDS code (some rows could repeat across pages if filters change)
-    dedup = {}
-    for r in all_rows:
-        key = r.get("cds_code") or r.get("details_url")
-        dedup[key] = r
-    rows = list(dedup.values())
-    print(f"📊 Total unique schools: {len(rows)}")
-    print("=" * 60)
+    logger.info(f"📊 Total unique schools: {len(rows)}")
+    logger.info("=" * 60)
 
     # Resume from checkpoint if present
     done_map = load_checkpoint()
-    out_records: List[Dict] = []
-    
-    print("🔍 Fetching school details...")
+
+    logger.info("🔍 Fetching school details...")
     start_time = time.time()
     
     # Create a log file to track URLs being processed
@@ -312,59 +479,10 @@ def main():
         log.write(f"CDE School Scraper Log - {datetime.now()}\n")
         log.write("=" * 60 + "\n\n")
 
-    for i, row in enumerate(rows, 1):
-        cds = row.get("cds_code", f"row_{i}")
-        school_name = row.get("school", "Unknown")[:50]  # Truncate long names
-        details_url = row["details_url"]
-        
-        # Log the URL being processed
-        with log_file.open("a", encoding="utf-8") as log:
-            log.write(f"[{i:4d}/{len(rows)}] Processing: {school_name}\n")
-            log.write(f"  CDS Code: {cds}\n")
-            log.write(f"  URL: {details_url}\n")
-        
-        if cds in done_map:
-            merged = merge_dicts(row, done_map[cds])
-            out_records.append(merged)
-            print(f"   [{i:4d}/{len(rows)}] ⏭️  Skipped (cached): {school_name}")
-            with log_file.open("a", encoding="utf-8") as log:
-                log.write(f"  Status: SKIPPED (cached)\n\n")
-            continue
+    out_records = asyncio.run(fetch_all_details(rows, done_map, log_file, start_time))
 
-        time.sleep(SLEEP_BETWEEN)
-        resp = fetch(details_url)
-        if not resp:
-            print(f"   [{i:4d}/{len(rows)}] ❌ Failed: {school_name}")
-            details = {}
-            with log_file.open("a", encoding="utf-8") as log:
-                log.write(f"  Status: FAILED\n\n")
-            # If we hit captcha, save what we have and suggest stopping
-            if i > 1 and i % 10 == 0:  # Check every 10 failures
-                print(f"   ⚠️  Multiple failures detected. Consider stopping and resuming later.")
-        else:
-            details = parse_details_page(resp.text)
-            print(f"   [{i:4d}/{len(rows)}] ✅ Fetched: {school_name}")
-            with log_file.open("a", encoding="utf-8") as log:
-                log.write(f"  Status: SUCCESS\n")
-                log.write(f"  Details found: {len(details)} fields\n\n")
-
-        done_map[cds] = details
-        merged = merge_dicts(row, details)
-        out_records.append(merged)
-
-        # Save checkpoint every 25 (more frequent)
-        if i % 25 == 0:
-            save_checkpoint(done_map)
-            elapsed = time.time() - start_time
-            rate = i / elapsed if elapsed > 0 else 0
-            eta = (len(rows) - i) / rate if rate > 0 else 0
-            print(f"   💾 Checkpoint saved: {i}/{len(rows)} ({rate:.1f} schools/sec, ETA: {eta/60:.1f}min)")
-
-    # Final checkpoint
-    save_checkpoint(done_map)
-    
-    print("=" * 60)
-    print("💾 Saving results...")
+    logger.info("=" * 60)
+    logger.info("💾 Saving results...")
 
     # Normalize columns: put a few common details up front if present
     common_cols = [
@@ -376,40 +494,42 @@ def main():
     # Build a full column set
     all_keys = set()
     for rec in out_records:
-        all_keys.update(rec.keys())
+        all_keys.update(rec)
     # preserve order: common first, then the rest sorted
-    rest = [k for k in sorted(all_keys) if k not in common_cols]
+    common_set = set(common_cols)
+    rest = sorted(k for k in all_keys if k not in common_set)
     cols = [c for c in common_cols if c in all_keys] + rest
 
     # Write JSONL
-    print(f"   📄 Writing JSONL: {OUT_JSONL.name}")
-    with OUT_JSONL.open("w", encoding="utf-8") as f:
+    logger.info(f"   📄 Writing JSONL: {OUT_JSONL.name}")
+    with OUT_JSONL.open("wb") as f:
         for rec in out_records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.write(orjson.dumps(rec))
+            f.write(b"\n")
 
     # Write CSV
-    print(f"   📊 Writing CSV: {OUT_CSV.name}")
-    with OUT_CSV.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=cols)
-        writer.writeheader()
-        for rec in out_records:
-            writer.writerow({k: rec.get(k, "") for k in cols})
-
-    print("=" * 60)
-    print(f"🎉 SUCCESS! Scraped {len(out_records)} schools")
-    print(f"📁 Files saved:")
-    print(f"   - {OUT_CSV.resolve()}")
-    print(f"   - {OUT_JSONL.resolve()}")
-    print(f"   - {CHECKPOINT.resolve()}")
-    print(f"   - {log_file.resolve()}")
+    logger.info(f"   📊 Writing CSV: {OUT_CSV.name}")
+    # Columnar write: missing keys become nulls, written as empty cells
+    table = pa.Table.from_pylist(out_records, schema=pa.schema([(c, pa.string()) for c in cols]))
+    pcsv.write_csv(table, str(OUT_CSV))
+
+    logger.info("=" * 60)
+    logger.info(f"🎉 SUCCESS! Scraped {len(out_records)} schools")
+    logger.info(f"📁 Files saved:")
+    logger.info(f"   - {OUT_CSV.resolve()}")
+    logger.info(f"   - {OUT_JSONL.resolve()}")
+    logger.info(f"   - {CHECKPOINT.resolve()}")
+    logger.info(f"   - {log_file.resolve()}")
     
     # Show some stats
     total_time = time.time() - start_time
-    print(f"⏱️  Total time: {total_time/60:.1f} minutes")
-    print(f"📈 Average rate: {len(out_records)/total_time:.1f} schools/second")
+    logger.info(f"⏱️  Total time: {total_time/60:.1f} minutes")
+    logger.info(f"📈 Average rate: {len(out_records)/total_time:.1f} schools/second")
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-        print("\nInterrupted by user.")
+        logger.warning("\nInterrupted by user.")
+    finally:
+        console_buffer.flush()
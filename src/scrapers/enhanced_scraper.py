@@ -7,167 +7,227 @@ This version scrapes the home page AND all linked pages on the same domain.
 
 import requests
 import csv
-import json
+import orjson
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import urlparse, urljoin, urlunparse
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse, urljoin
+from selectolax.lexbor import LexborHTMLParser
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from collections import deque
 import re
+import hashlib
+from pathlib import Path
+import sys
+
+# Add src directory to Python path (also when run directly)
+_SRC_DIR = str(Path(__file__).resolve().parent.parent)
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from utils.page_fetch import MAX_RESPONSE_BYTES, collapse_whitespace
+
+# Link schemes that can never be crawled; skipped before any URL parsing
+_NON_HTTP_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:', 'sms:')
+
+# Filename sanitizing patterns for save_results
+_UNSAFE_CHARS = re.compile(r'[^\w\s-]')
+_SEPARATOR_RUN = re.compile(r'[-\s]+')
+
+
+def content_hash(text):
+    """64-bit digest of page text, used to drop duplicate pages."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
 
 
 class SchoolScraper:
-    def __init__(self, delay=2.0, max_pages_per_school=10):
+    def __init__(self, delay=2.0, max_pages_per_school=10, page_workers=4, max_workers=16):
         self.delay = delay
         self.max_pages_per_school = max_pages_per_school
+        self.page_workers = page_workers
+        self.max_workers = max_workers
+        # Next free request slot per host; requests to one host stay `delay` apart
+        self._last_request_time = {}
+        self._host_lock = threading.Lock()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        # Larger keep-alive pool plus retry/backoff on transient errors
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504),
+                      allowed_methods=('GET', 'HEAD'))
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def wait_for_host(self, url):
+        """Block until the polite delay since the previous request to url's host has passed."""
+        host = urlparse(url).netloc
+        with self._host_lock:
+            now = time.monotonic()
+            slot = max(now, self._last_request_time.get(host, now - self.delay) + self.delay)
+            self._last_request_time[host] = slot
+        if slot > now:
+            time.sleep(slot - now)
     
     def get_domain(self, url):
         """Extract domain from URL."""
         parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}"
     
-    def is_same_domain(self, url1, url2):
-        """Check if two URLs are from the same domain."""
-        return self.get_domain(url1) == self.get_domain(url2)
-    
-    def clean_url(self, url, base_url):
-        """Clean and normalize URL."""
-        # Handle relative URLs
-        if url.startswith('/'):
-            return urljoin(base_url, url)
-        elif url.startswith('http'):
-            return url
-        else:
-            return urljoin(base_url, url)
-    
-    def extract_links(self, soup, base_url, domain):
+    def extract_links(self, tree, base_url, domain):
         """Extract all internal links from the page."""
         links = set()
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            full_url = self.clean_url(href, base_url)
+        for link in tree.css('a[href]'):
+            href = (link.attributes['href'] or '').strip()
+            if href.lower().startswith(_NON_HTTP_SCHEMES):
+                continue
+            
+            # Resolve once, then drop the fragment and query by string cuts
+            full_url = urljoin(base_url, href).split('#', 1)[0].split('?', 1)[0]
             
-            # Only include same-domain links
-            if self.is_same_domain(full_url, base_url):
-                # Remove fragments and query parameters for deduplication
-                parsed = urlparse(full_url)
-                clean_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
-                links.add(clean_url)
+            # Only include same-domain links (domain is scheme://netloc)
+            if full_url.startswith(domain) and full_url[len(domain):len(domain) + 1] in ('', '/'):
+                links.add(full_url)
         
         return list(links)
     
     def scrape_page(self, url):
-        """Scrape a single page."""
+        """
+        Scrape a single page.
+        
+        Returns:
+            (page dict, list of internal links found on the page)
+        """
         try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
+            self.wait_for_host(url)
+            # Check the headers before downloading so PDFs, images and huge
+            # dumps are never read or parsed
+            with self.session.get(url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                status_code = response.status_code
+                
+                content_type = response.headers.get('Content-Type', '')
+                if content_type and 'html' not in content_type:
+                    return self._empty_page(url, f"Skipped: non-HTML content ({content_type})", status_code), []
+                if int(response.headers.get('Content-Length') or 0) > MAX_RESPONSE_BYTES:
+                    return self._empty_page(url, "Skipped: response too large", status_code), []
+                
+                content = response.raw.read(MAX_RESPONSE_BYTES, decode_content=True)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            tree = LexborHTMLParser(content)
             
             # Extract basic info
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else ""
+            title = tree.css_first('title')
+            title_text = title.text().strip() if title else ""
             
-            description = soup.find('meta', attrs={'name': 'description'})
-            description_text = description.get('content', '').strip() if description else ""
+            description = tree.css_first('meta[name="description"]')
+            description_text = (description.attributes.get('content') or '').strip() if description else ""
             
             # Get main text content
-            for script in soup(["script", "style"]):
+            for script in tree.css('script, style'):
                 script.decompose()
             
-            body = soup.find('body')
-            text_content = body.get_text() if body else ""
-            text_content = ' '.join(text_content.split())
+            body = tree.css_first('body')
+            text_content = body.text() if body else ""
+            text_content = collapse_whitespace(text_content, 5000)  # Limit content
             
             # Extract links for further crawling
-            links = self.extract_links(soup, url, self.get_domain(url))
+            links = self.extract_links(tree, url, self.get_domain(url))
             
             return {
                 'url': url,
-                'status_code': response.status_code,
-                'response_size': len(response.content),
+                'status_code': status_code,
+                'response_size': len(content),
                 'title': title_text,
                 'description': description_text,
-                'text_content': text_content[:5000],  # Limit content
+                'text_content': text_content,
                 'links_found': len(links),
                 'scraped_at': datetime.now().isoformat()
-            }
+            }, links
             
         except Exception as e:
-            return {
-                'url': url,
-                'status_code': 0,
-                'response_size': 0,
-                'title': f"Error: {str(e)}",
-                'description': "",
-                'text_content': "",
-                'links_found': 0,
-                'scraped_at': datetime.now().isoformat()
-            }
+            return self._empty_page(url, f"Error: {str(e)}"), []
+    
+    def _empty_page(self, url, title, status_code=0):
+        """Page record for a failed or skipped fetch."""
+        return {
+            'url': url,
+            'status_code': status_code,
+            'response_size': 0,
+            'title': title,
+            'description': "",
+            'text_content': "",
+            'links_found': 0,
+            'scraped_at': datetime.now().isoformat()
+        }
     
     def scrape_school_website(self, url, school_data):
         """Scrape a school website including all linked pages."""
         print(f"  🏠 Scraping home page: {url}")
         
         # Scrape home page
-        home_page = self.scrape_page(url)
+        home_page, links = self.scrape_page(url)
         home_page.update(school_data)
         home_page['page_type'] = 'home'
         
         all_pages = [home_page]
         visited_urls = {url}
+        # 64-bit digests of page text already kept for this school
+        seen_content = {content_hash(home_page['text_content'])}
         
-        # Get links from home page
+        # Follow the links already extracted from the home page
         if home_page['status_code'] == 200:
             try:
-                response = self.session.get(url, timeout=30)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                links = self.extract_links(soup, url, self.get_domain(url))
-                
                 print(f"  🔗 Found {len(links)} internal links")
                 
                 # Limit number of pages to scrape
                 links_to_scrape = links[:self.max_pages_per_school - 1]  # -1 for home page
+                pending = [link for link in links_to_scrape if link not in visited_urls]
+                total = len(pending) + 1
                 
-                for i, link in enumerate(links_to_scrape, 1):
-                    if link not in visited_urls:
-                        print(f"  📄 Scraping page {i+1}/{min(len(links_to_scrape)+1, self.max_pages_per_school)}: {link}")
-                        
-                        page_data = self.scrape_page(link)
+                # Fetch the internal pages concurrently; wait_for_host keeps them
+                # spaced by the polite delay, only their latency overlaps
+                with ThreadPoolExecutor(max_workers=self.page_workers) as executor:
+                    results = executor.map(self.scrape_page, pending)
+                    for i, (link, (page_data, _)) in enumerate(zip(pending, results), 2):
+                        print(f"  📄 Scraped page {i}/{total}: {link}")
+                        # Templated sites often serve the same text under several
+                        # URLs; keep only the first copy
+                        text = page_data['text_content']
+                        if text:
+                            digest = content_hash(text)
+                            if digest in seen_content:
+                                continue
+                            seen_content.add(digest)
                         page_data.update(school_data)
                         page_data['page_type'] = 'internal'
-                        
                         all_pages.append(page_data)
-                        visited_urls.add(link)
-                        
-                        # Be respectful - add delay between pages
-                        time.sleep(self.delay)
-                        
+                visited_urls.update(pending)
+                
             except Exception as e:
                 print(f"  ⚠️  Error extracting links: {e}")
         
         return all_pages
     
     def scrape_schools(self, schools):
-        """Scrape multiple schools."""
-        all_results = []
-        
-        for i, school in enumerate(schools, 1):
+        """Scrape multiple schools concurrently; results keep the input order."""
+        def scrape_one(numbered):
+            i, school = numbered
             print(f"Scraping {i}/{len(schools)}: {school['school_name']} ({school['domain']})")
-            
             pages = self.scrape_school_website(school['website'], school)
-            all_results.extend(pages)
-            
             print(f"  ✅ Scraped {len(pages)} pages")
-            
-            # Be respectful - add delay between schools
-            if i < len(schools):
-                time.sleep(self.delay)
+            return pages
+        
+        # Schools are on independent hosts, so there is no global sleep between
+        # them; wait_for_host() still spaces requests to any single host
+        all_results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for pages in executor.map(scrape_one, enumerate(schools, 1)):
+                all_results.extend(pages)
         
         return all_results
 
@@ -193,10 +253,9 @@ def load_schools_from_csv(csv_file):
 
 def save_results(results, output_dir="scraped_data"):
     """Save results in organized structure: separate JSON file per school."""
-    import os
-    
     # Create output directory
-    os.makedirs(output_dir, exist_ok=True)
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
     
     # Group results by school
     schools_data = {}
@@ -232,18 +291,17 @@ def save_results(results, output_dir="scraped_data"):
     saved_files = []
     for school_key, school_data in schools_data.items():
         # Clean filename (remove special characters)
-        safe_filename = re.sub(r'[^\w\s-]', '', school_key).strip()
-        safe_filename = re.sub(r'[-\s]+', '_', safe_filename)
+        safe_filename = _SEPARATOR_RUN.sub('_', _UNSAFE_CHARS.sub('', school_key).strip())
         
-        json_file = os.path.join(output_dir, f"{safe_filename}.json")
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(school_data, f, ensure_ascii=False, indent=2)
+        json_file = str(out_dir / f"{safe_filename}.json")
+        with open(json_file, 'wb') as f:
+            f.write(orjson.dumps(school_data, option=orjson.OPT_NON_STR_KEYS))
         
         saved_files.append(json_file)
     
     # Also save a summary CSV
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    summary_csv = os.path.join(output_dir, f"scraping_summary_{timestamp}.csv")
+    summary_csv = str(out_dir / f"scraping_summary_{timestamp}.csv")
     
     with open(summary_csv, 'w', newline='', encoding='utf-8') as f:
         if results:
@@ -257,7 +315,6 @@ def save_results(results, output_dir="scraped_data"):
 def main():
     """Main function."""
     import argparse
-    from pathlib import Path
     
     # Set default paths based on project structure
     project_root = Path(__file__).parent.parent.parent
@@ -268,9 +325,11 @@ def main():
     parser.add_argument('--csv-file', default=str(default_csv),
                        help='CSV file with school data')
     parser.add_argument('--delay', type=float, default=2.0,
-                       help='Delay between requests in seconds')
+                       help='Delay between requests to the same host in seconds')
     parser.add_argument('--max-pages', type=int, default=10,
                        help='Maximum pages to scrape per school')
+    parser.add_argument('--concurrency', type=int, default=16,
+                       help='Number of schools scraped in parallel')
     parser.add_argument('--limit', type=int, default=None,
                        help='Limit number of schools to scrape (for testing)')
     parser.add_argument('--output-dir', default=str(default_output),
@@ -280,7 +339,8 @@ def main():
     
     print("🚀 Enhanced Charter Schools Scraper - Multi-page")
     print(f"📁 CSV file: {args.csv_file}")
-    print(f"⏱️  Delay: {args.delay} seconds")
+    print(f"⏱️  Delay: {args.delay} seconds per host")
+    print(f"🔀 Concurrency: {args.concurrency} schools")
     print(f"📄 Max pages per school: {args.max_pages}")
     if args.limit:
         print(f"🔢 Limit: {args.limit} schools")
@@ -293,7 +353,8 @@ def main():
     print(f"📊 Total schools to scrape: {len(schools)}")
     
     # Create scraper
-    scraper = SchoolScraper(delay=args.delay, max_pages_per_school=args.max_pages)
+    scraper = SchoolScraper(delay=args.delay, max_pages_per_school=args.max_pages,
+                            max_workers=args.concurrency)
     
     # Scrape schools
     results = scraper.scrape_schools(schools)
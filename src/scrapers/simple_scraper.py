@@ -5,81 +5,175 @@ Simple Charter Schools Scraper
 A lean, straightforward scraper that just gets the job done.
 """
 
+import asyncio
+import aiohttp
 import requests
 import csv
-import json
 import time
+import json
 from datetime import datetime
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+import sys
+from pathlib import Path
+
+# Add src directory to Python path (also when run directly)
+_SRC_DIR = str(Path(__file__).resolve().parent.parent)
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from utils.page_fetch import MAX_RESPONSE_BYTES, collapse_whitespace, read_capped
+
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+
+def parse_html(content, school_data, url, status_code):
+    """Build the result record for a fetched page."""
+    # Parse with Lexbor (C-backed, much faster than html.parser)
+    tree = LexborHTMLParser(content)
+    
+    # Extract basic info
+    title = tree.css_first('title')
+    title_text = title.text().strip() if title else ""
+    
+    description = tree.css_first('meta[name="description"]')
+    description_text = (description.attributes.get('content') or '').strip() if description else ""
+    
+    # Get main text content
+    # Remove script and style elements
+    for script in tree.css('script, style'):
+        script.decompose()
+    
+    # Get text from body
+    body = tree.css_first('body')
+    text_content = body.text() if body else ""
+    
+    # Clean up text
+    text_content = collapse_whitespace(text_content, 5000)  # Limit to 5000 chars
+    
+    return {
+        'cds_code': school_data['cds_code'],
+        'school_name': school_data['school_name'],
+        'county': school_data['county'],
+        'district': school_data['district'],
+        'email': school_data['email'],
+        'domain': school_data['domain'],
+        'url': url,
+        'status_code': status_code,
+        'response_size': len(content),
+        'scraped_at': datetime.now().isoformat(),
+        'title': title_text,
+        'description': description_text,
+        'text_content': text_content,
+        'clean_text': f"School: {school_data['school_name']}, County: {school_data['county']}, District: {school_data['district']}, Title: {title_text}, Description: {description_text}, Content: {text_content[:2000]}"
+    }
+
+
+def empty_result(school_data, url, title, status_code=0):
+    """Build the result record for a failed or skipped fetch."""
+    return {
+        'cds_code': school_data['cds_code'],
+        'school_name': school_data['school_name'],
+        'county': school_data['county'],
+        'district': school_data['district'],
+        'email': school_data['email'],
+        'domain': school_data['domain'],
+        'url': url,
+        'status_code': status_code,
+        'response_size': 0,
+        'scraped_at': datetime.now().isoformat(),
+        'title': title,
+        'description': "",
+        'text_content': "",
+        'clean_text': f"School: {school_data['school_name']}, URL: {url}, {title}"
+    }
+
+
+def error_result(school_data, url, e):
+    """Build the result record for a failed fetch."""
+    return empty_result(school_data, url, f"Error: {str(e)}")
 
 
 def scrape_school_website(url, school_data):
     """Scrape a single school website."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=30)
+        response = requests.get(url, headers=HEADERS, timeout=30)
         response.raise_for_status()
-        
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract basic info
-        title = soup.find('title')
-        title_text = title.get_text().strip() if title else ""
-        
-        description = soup.find('meta', attrs={'name': 'description'})
-        description_text = description.get('content', '').strip() if description else ""
-        
-        # Get main text content
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Get text from body
-        body = soup.find('body')
-        text_content = body.get_text() if body else ""
-        
-        # Clean up text
-        text_content = ' '.join(text_content.split())
-        
-        return {
-            'cds_code': school_data['cds_code'],
-            'school_name': school_data['school_name'],
-            'county': school_data['county'],
-            'district': school_data['district'],
-            'email': school_data['email'],
-            'domain': school_data['domain'],
-            'url': url,
-            'status_code': response.status_code,
-            'response_size': len(response.content),
-            'scraped_at': datetime.now().isoformat(),
-            'title': title_text,
-            'description': description_text,
-            'text_content': text_content[:5000],  # Limit to 5000 chars
-            'clean_text': f"School: {school_data['school_name']}, County: {school_data['county']}, District: {school_data['district']}, Title: {title_text}, Description: {description_text}, Content: {text_content[:2000]}"
-        }
-        
+        return parse_html(response.content, school_data, url, response.status_code)
+    except Exception as e:
+        return error_result(school_data, url, e)
+
+
+class HostRateLimiter:
+    """
+    Per-host request spacing for the event loop.
+    
+    Each host has a next free slot; acquire() reserves the caller's slot and
+    pushes the next one `delay` later, then sleeps until its own slot. Hosts
+    never wait on each other, and no lock is needed because the reservation
+    runs without yielding to the loop.
+    """
+    
+    def __init__(self, delay):
+        self.delay = delay
+        self._next = {}
+    
+    async def acquire(self, host):
+        now = time.monotonic()
+        slot = max(now, self._next.get(host, now))
+        self._next[host] = slot + self.delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def fetch_school(session, sem, school, limiter, label):
+    """Fetch one school site, waiting out the polite delay for its host only."""
+    url = school['website']
+    loop = asyncio.get_running_loop()
+    
+    await limiter.acquire(urlparse(url).netloc or school['domain'])
+    
+    async with sem:
+        print(f"Scraping {label}: {school['school_name']} ({school['domain']})")
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as r:
+                r.raise_for_status()
+                # Skip non-HTML and oversized responses before reading the body
+                content_type = r.headers.get('Content-Type', '')
+                if content_type and 'html' not in content_type:
+                    return empty_result(school, url, f"Skipped: non-HTML content ({content_type})", r.status)
+                if (r.content_length or 0) > MAX_RESPONSE_BYTES:
+                    return empty_result(school, url, "Skipped: response too large", r.status)
+                content = await read_capped(r.content, MAX_RESPONSE_BYTES)
+                status = r.status
+        except Exception as e:
+            return error_result(school, url, e)
+    
+    # Parse on a worker thread so the event loop keeps other downloads moving
+    try:
+        return await loop.run_in_executor(None, parse_html, content, school, url, status)
     except Exception as e:
-        return {
-            'cds_code': school_data['cds_code'],
-            'school_name': school_data['school_name'],
-            'county': school_data['county'],
-            'district': school_data['district'],
-            'email': school_data['email'],
-            'domain': school_data['domain'],
-            'url': url,
-            'status_code': 0,
-            'response_size': 0,
-            'scraped_at': datetime.now().isoformat(),
-            'title': f"Error: {str(e)}",
-            'description': "",
-            'text_content': "",
-            'clean_text': f"School: {school_data['school_name']}, URL: {url}, Error: {str(e)}"
-        }
+        return error_result(school, url, e)
+
+
+async def run_all(schools, concurrency=32, delay=2.0):
+    """Scrape all schools concurrently; results keep the input order."""
+    sem = asyncio.Semaphore(concurrency)
+    limiter = HostRateLimiter(delay)
+    total = len(schools)
+    # Resolve each school's host once per run (cached 10 min) and keep idle
+    # connections open for follow-up requests
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=2,
+                                     use_dns_cache=True, ttl_dns_cache=600,
+                                     keepalive_timeout=30)
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector) as session:
+        return await asyncio.gather(*(
+            fetch_school(session, sem, school, limiter, f"{i}/{total}")
+            for i, school in enumerate(schools, 1)
+        ))
 
 
 def load_schools_from_csv(csv_file):
@@ -130,7 +224,9 @@ def main():
     parser.add_argument('--csv-file', default='charter_schools_for_scraping.csv',
                        help='CSV file with school data')
     parser.add_argument('--delay', type=float, default=2.0,
-                       help='Delay between requests in seconds')
+                       help='Delay between requests to the same host in seconds')
+    parser.add_argument('--concurrency', type=int, default=32,
+                       help='Number of schools fetched in parallel')
     parser.add_argument('--limit', type=int, default=None,
                        help='Limit number of schools to scrape (for testing)')
     parser.add_argument('--output-prefix', default='scraped_schools',
@@ -140,7 +236,8 @@ def main():
     
     print("🚀 Starting Simple Charter Schools Scraper")
     print(f"📁 CSV file: {args.csv_file}")
-    print(f"⏱️  Delay: {args.delay} seconds")
+    print(f"⏱️  Delay: {args.delay} seconds per host")
+    print(f"🔀 Concurrency: {args.concurrency}")
     if args.limit:
         print(f"🔢 Limit: {args.limit} schools")
     
@@ -152,16 +249,7 @@ def main():
     print(f"📊 Total schools to scrape: {len(schools)}")
     
     # Scrape schools
-    results = []
-    for i, school in enumerate(schools, 1):
-        print(f"Scraping {i}/{len(schools)}: {school['school_name']} ({school['domain']})")
-        
-        result = scrape_school_website(school['website'], school)
-        results.append(result)
-        
-        # Be respectful - add delay
-        if i < len(schools):  # Don't delay after the last request
-            time.sleep(args.delay)
+    results = asyncio.run(run_all(schools, concurrency=args.concurrency, delay=args.delay))
     
     # Save results
     csv_file, jsonl_file = save_results(results, args.output_prefix)
@@ -6,30 +6,194 @@ This script checks robots.txt compliance for all school websites
 before starting the scraping process.
 """
 
+import asyncio
 import csv
+import aiohttp
 import requests
+from protego import Protego
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlparse, urljoin
-import time
+import functools
+import logging
+import os
+import re
 import sys
+import tempfile
+import time
+from pathlib import Path
+from logging.handlers import MemoryHandler
+
+# Add src directory to Python path (also when run directly)
+_SRC_DIR = str(Path(__file__).resolve().parent.parent)
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from utils.page_fetch import read_capped
+
+# Per-school progress lines go out in batches of 100 instead of one write per
+# print(); the summary is printed normally once the buffer has been flushed.
+logger = logging.getLogger("robots_compliance")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_console = logging.StreamHandler(sys.stdout)
+_console.setFormatter(logging.Formatter("%(message)s"))
+console_buffer = MemoryHandler(capacity=100, flushLevel=logging.ERROR, target=_console)
+logger.addHandler(console_buffer)
+
+# robots.txt cache: one file per domain, freshness from the file's mtime.
+# Fetch failures are cached as an empty file with a shorter TTL so a host
+# that was down is retried soon instead of being treated as no-robots all day.
+ROBOTS_CACHE_DIR = Path.home() / ".cache" / "charter_robots"
+ROBOTS_TTL = 24 * 3600
+ROBOTS_MISS_TTL = 3600
+
+# Google stops reading robots.txt after 500 KiB; anything past that is ignored
+MAX_ROBOTS_BYTES = 500 * 1024
 
+# Minimum seconds between two robots.txt requests to the same host. Each
+# school is normally its own host, so this only bites on repeat lookups.
+POLITENESS_DELAY = 1.0
+_LAST_HIT = {}  # host -> monotonic time its latest request is (or was) due
+
+# One robots.txt directive per line; the value stops at a trailing "# comment"
+_DIRECTIVE_RE = re.compile(
+    r'^[ \t]*(user-agent|disallow|allow|crawl-delay)[ \t]*:[ \t]*([^\r\n#]*)',
+    re.IGNORECASE | re.MULTILINE,
+)
+
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=100, pool_maxsize=100,
+                       max_retries=Retry(total=2, backoff_factor=0.3))
+_SESSION.mount('https://', _adapter)
+_SESSION.mount('http://', _adapter)
+
+
+def _cache_path(domain):
+    return ROBOTS_CACHE_DIR / f"{domain.replace(os.sep, '_')}.txt"
+
+
+def read_cached_robots(domain):
+    """Return (hit, content); content is None for a cached fetch failure."""
+    path = _cache_path(domain)
+    try:
+        st = path.stat()
+    except OSError:
+        return False, None
+    ttl = ROBOTS_TTL if st.st_size else ROBOTS_MISS_TTL
+    if time.time() - st.st_mtime > ttl:
+        return False, None
+    return (True, path.read_text(encoding='utf-8')) if st.st_size else (True, None)
 
+
+def write_cached_robots(domain, content):
+    """Atomically store content (or an empty failure sentinel) for domain."""
+    try:
+        ROBOTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=ROBOTS_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content or '')
+        os.replace(tmp, _cache_path(domain))
+    except OSError:
+        pass  # caching is best effort
+
+
+def _reserve_slot(domain):
+    """Book the next request slot for domain and return how long to wait for it."""
+    now = time.monotonic()
+    slot = max(now, _LAST_HIT.get(domain, -POLITENESS_DELAY) + POLITENESS_DELAY)
+    _LAST_HIT[domain] = slot
+    return slot - now
+
+
+def ttl_cache(fetch):
+    """Serve fetch(domain) from the on-disk robots.txt cache while fresh."""
+    @functools.wraps(fetch)
+    def wrapper(domain):
+        hit, content = read_cached_robots(domain)
+        if hit:
+            return content
+        content = fetch(domain)
+        write_cached_robots(domain, content)
+        return content
+    return wrapper
+
+
+@ttl_cache
 def get_robots_txt(domain):
     """Get robots.txt content for a domain."""
     try:
         robots_url = f"https://{domain}/robots.txt"
-        response = requests.get(robots_url, timeout=10)
-        if response.status_code == 200:
-            return response.text
-        else:
-            return None
+        wait = _reserve_slot(domain)
+        if wait > 0:
+            time.sleep(wait)
+        with _SESSION.get(robots_url, timeout=10, stream=True) as response:
+            if response.status_code == 200:
+                body = response.raw.read(MAX_ROBOTS_BYTES, decode_content=True)
+                return body.decode('utf-8', errors='replace')
+            else:
+                return None
     except Exception as e:
         return None
 
 
+async def fetch_robots(session, sem, domain):
+    """Async variant of get_robots_txt; sem bounds the fetches in flight."""
+    robots_url = f"https://{domain}/robots.txt"
+    async with sem:
+        wait = _reserve_slot(domain)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            async with session.get(robots_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 200:
+                    body = await read_capped(response.content, MAX_ROBOTS_BYTES)
+                    return body.decode('utf-8', errors='replace')
+                return None
+        except Exception:
+            return None
+
+
+async def fetch_all_robots(domains, concurrency=50):
+    """
+    Fetch robots.txt for every unique domain concurrently.
+    
+    Fresh entries in the disk cache are used without any request.
+    
+    Returns:
+        dict: {domain: content or None}
+    """
+    robots = {}
+    missing = []
+    for domain in dict.fromkeys(domains):
+        hit, content = read_cached_robots(domain)
+        if hit:
+            robots[domain] = content
+        else:
+            missing.append(domain)
+    
+    if missing:
+        sem = asyncio.Semaphore(concurrency)
+        # Each host is asked for exactly one file, so a finished connection is
+        # never reused; close it right away rather than holding hundreds of
+        # idle sockets open until keepalive_timeout
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=1, ttl_dns_cache=300,
+                                         force_close=True)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            contents = await asyncio.gather(*(fetch_robots(session, sem, d) for d in missing))
+        for domain, content in zip(missing, contents):
+            write_cached_robots(domain, content)
+            robots[domain] = content
+    return robots
+
+
 def check_robots_compliance(domain, user_agent="*"):
     """Check if a domain allows scraping for a user agent."""
-    robots_content = get_robots_txt(domain)
-    
+    return parse_robots(get_robots_txt(domain), domain, user_agent)
+
+
+def parse_robots(robots_content, domain, user_agent="*"):
+    """Build the compliance result from robots.txt content (None if unavailable)."""
     if not robots_content:
         return {
             'status': 'no_robots',
@@ -37,43 +201,39 @@ def check_robots_compliance(domain, user_agent="*"):
             'allows_scraping': True  # Assume allowed if no robots.txt
         }
     
-    lines = robots_content.lower().split('\n')
-    current_user_agent = None
-    disallowed_paths = []
-    crawl_delay = None
-    
-    for line in lines:
-        line = line.strip()
-        if not line or line.startswith('#'):
-            continue
-            
-        if line.startswith('user-agent:'):
-            current_user_agent = line.split(':', 1)[1].strip()
-        elif line.startswith('disallow:'):
-            if current_user_agent == user_agent or current_user_agent == '*':
-                path = line.split(':', 1)[1].strip()
-                if path:
-                    disallowed_paths.append(path)
-        elif line.startswith('crawl-delay:'):
-            if current_user_agent == user_agent or current_user_agent == '*':
-                try:
-                    crawl_delay = int(line.split(':', 1)[1].strip())
-                except ValueError:
-                    pass
-    
-    # Check if root path is disallowed
-    root_disallowed = any(path == '/' or path == '' for path in disallowed_paths)
+    # Protego implements the full spec: agent groups, Allow precedence by
+    # rule length, wildcards and trailing comments
+    rp = Protego.parse(robots_content)
     
     return {
         'status': 'checked',
         'message': f"Robots.txt found",
-        'allows_scraping': not root_disallowed,
-        'disallowed_paths': disallowed_paths,
-        'crawl_delay': crawl_delay,
+        'allows_scraping': rp.can_fetch(f"https://{domain}/", user_agent),
+        'disallowed_paths': disallowed_paths(robots_content, user_agent),
+        'crawl_delay': rp.crawl_delay(user_agent),
         'robots_content': robots_content
     }
 
 
+def disallowed_paths(robots_content, user_agent="*"):
+    """List the Disallow paths that apply to user_agent, for the report only."""
+    current_user_agent = None
+    paths = []
+    
+    for m in _DIRECTIVE_RE.finditer(robots_content):
+        key = m.group(1).lower()
+        value = m.group(2).strip().lower()
+        
+        if key == 'user-agent':
+            current_user_agent = value
+        elif key == 'disallow':
+            if current_user_agent == user_agent or current_user_agent == '*':
+                if value:
+                    paths.append(value)
+    
+    return paths
+
+
 def check_all_schools(csv_file):
     """Check robots.txt compliance for all schools."""
     print("🤖 Checking robots.txt compliance for all school websites...")
@@ -86,16 +246,22 @@ def check_all_schools(csv_file):
     no_robots_schools = 0
     
     with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+        rows = list(csv.DictReader(f))
+    
+    # Every school is on its own host, so fetch all robots.txt files at once
+    # (one connection per host) instead of one at a time with a sleep
+    robots_by_domain = asyncio.run(fetch_all_robots([row['domain'] for row in rows]))
+    
+    try:
+        for row in rows:
             total_schools += 1
             domain = row['domain']
             school_name = row['school_name']
             url = row['website']
             
-            print(f"Checking {total_schools:3d}/894: {school_name[:40]:<40} ({domain})")
+            logger.info(f"Checking {total_schools:3d}/{len(rows)}: {school_name[:40]:<40} ({domain})")
             
-            compliance = check_robots_compliance(domain)
+            compliance = parse_robots(robots_by_domain[domain], domain)
             results.append({
                 'school_name': school_name,
                 'domain': domain,
@@ -106,18 +272,17 @@ def check_all_schools(csv_file):
             if compliance['allows_scraping']:
                 if compliance['status'] == 'no_robots':
                     no_robots_schools += 1
-                    print(f"  ✅ No robots.txt - assuming allowed")
+                    logger.info(f"  ✅ No robots.txt - assuming allowed")
                 else:
                     compliant_schools += 1
-                    print(f"  ✅ Robots.txt allows scraping")
+                    logger.info(f"  ✅ Robots.txt allows scraping")
             else:
                 non_compliant_schools += 1
-                print(f"  ❌ Robots.txt disallows scraping")
+                logger.info(f"  ❌ Robots.txt disallows scraping")
                 if compliance.get('disallowed_paths'):
-                    print(f"      Disallowed paths: {compliance['disallowed_paths']}")
-            
-            # Be respectful - small delay between checks
-            time.sleep(0.5)
+                    logger.info(f"      Disallowed paths: {compliance['disallowed_paths']}")
+    finally:
+        console_buffer.flush()
     
     print("\n" + "=" * 60)
     print("📊 ROBOTS.TXT COMPLIANCE SUMMARY")
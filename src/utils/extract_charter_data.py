@@ -6,10 +6,25 @@ This script extracts cds_code, website, and email from the charter schools JSONL
 and creates a CSV file for the scraper to use.
 """
 
-import json
 import csv
+import hashlib
+import multiprocessing as mp
+import os
 import re
-from urllib.parse import urlparse
+from itertools import islice
+
+import orjson
+
+# Screen-reader text the CDE site appends to every website link
+_LINK_SUFFIX = ' Link opens new browser tab'
+_SCHEMES = ('http://', 'https://')
+
+# Lines handed to a worker at a time, and the input size below which the
+# process pool costs more to start than it saves
+PARSE_BATCH_LINES = 1000
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+
+HEADER = ('cds_code', 'website', 'email', 'domain', 'school_name', 'county', 'district')
 
 def clean_website_url(web_addr):
     """Clean and normalize website URL."""
@@ -17,93 +32,148 @@ def clean_website_url(web_addr):
         return None
     
     # Remove "Link opens new browser tab" suffix
-    clean_url = web_addr.replace(' Link opens new browser tab', '').strip()
+    clean_url = web_addr.strip()
+    if clean_url.endswith(_LINK_SUFFIX):
+        clean_url = clean_url[:-len(_LINK_SUFFIX)].rstrip()
     
     if not clean_url:
         return None
     
     # Add protocol if missing
-    if not clean_url.startswith(('http://', 'https://')):
+    if not clean_url.startswith(_SCHEMES):
         clean_url = 'https://' + clean_url
     
     return clean_url
 
 def extract_domain(url):
-    """Extract domain from URL for deduplication."""
-    try:
-        parsed = urlparse(url)
-        return parsed.netloc.lower()
-    except:
+    """Extract domain from URL for deduplication.
+
+    clean_website_url always adds a scheme, so the netloc is simply the
+    third '/'-separated field (up to any query or fragment).
+    """
+    if '://' not in url:
         return None
+    netloc = url.split('/', 3)[2]
+    for sep in '?#':
+        netloc = netloc.split(sep, 1)[0]
+    return netloc.lower()
+
+def domain_key(domain):
+    """64-bit blake2b digest of a domain, kept in the dedup set instead of the string."""
+    return int.from_bytes(hashlib.blake2b(domain.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def _parse_batch(batch):
+    """Parse (line_num, line) pairs into (line_num, row, error) triples.
+
+    row is a tuple in HEADER order, or None for a blank line or a school
+    with no usable website; error is the JSON error message for a
+    malformed line.
+    """
+    parsed = []
+    for line_num, line in batch:
+        if not line.strip():
+            parsed.append((line_num, None, None))
+            continue
+        try:
+            data = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            parsed.append((line_num, None, str(e)))
+            continue
+        
+        # Clean website URL
+        clean_url = clean_website_url(data.get('web address', '').strip())
+        if not clean_url:
+            parsed.append((line_num, None, None))
+            continue
+        
+        parsed.append((line_num, (
+            data.get('cds_code', '').strip(),
+            clean_url,
+            data.get('email', '').strip(),
+            extract_domain(clean_url),
+            data.get('school', '').strip(),
+            data.get('county', '').strip(),
+            data.get('district', '').strip()
+        ), None))
+    return parsed
+
+def _batches(f):
+    """Yield lists of up to PARSE_BATCH_LINES (line_num, line) pairs."""
+    numbered = enumerate(f, 1)
+    while True:
+        batch = list(islice(numbered, PARSE_BATCH_LINES))
+        if not batch:
+            return
+        yield batch
 
-def extract_charter_data(jsonl_file, output_csv):
-    """Extract charter schools data from JSONL to CSV."""
+def extract_charter_data(jsonl_file, output_csv, workers=None):
+    """Extract charter schools data from JSONL to CSV.
+
+    Large inputs are parsed across a process pool of `workers` processes
+    (default: all cores); smaller ones, or workers=1, are parsed inline.
+    Batches come back in file order and dedup happens here, so the first
+    school seen for a domain always wins. Returns the number of unique
+    schools written.
+    """
     
     print(f"Extracting data from {jsonl_file}...")
     
-    schools_data = []
-    seen_domains = set()
+    seen_domains = set()  # domain_key() digests, ~40% smaller than the strings
     duplicate_count = 0
+    written = 0
+    line_num = 0
     
-    with open(jsonl_file, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            if line.strip():
-                try:
-                    data = json.loads(line)
-                    
-                    cds_code = data.get('cds_code', '').strip()
-                    email = data.get('email', '').strip()
-                    web_addr = data.get('web address', '').strip()
-                    
-                    # Clean website URL
-                    clean_url = clean_website_url(web_addr)
+    if workers is None:
+        workers = 1 if os.path.getsize(jsonl_file) < PARALLEL_MIN_BYTES else os.cpu_count()
+    
+    print(f"Writing unique schools to {output_csv}...")
+    
+    with open(jsonl_file, 'rb') as f, open(output_csv, 'w', newline='', encoding='utf-8') as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(HEADER)
+        
+        pool = mp.Pool(workers) if workers > 1 else None
+        try:
+            if pool is not None:
+                parsed_batches = pool.imap(_parse_batch, _batches(f))
+            else:
+                parsed_batches = map(_parse_batch, _batches(f))
+            
+            for batch in parsed_batches:
+                for line_num, row, error in batch:
+                    if error is not None:
+                        print(f"Error parsing line {line_num}: {error}")
+                        continue
+                    if row is None:
+                        continue
                     
-                    if clean_url:
-                        domain = extract_domain(clean_url)
-                        
-                        # Check for duplicates based on domain
-                        if domain and domain in seen_domains:
+                    # Check for duplicates based on domain
+                    domain = row[3]
+                    if domain:
+                        key = domain_key(domain)
+                        if key in seen_domains:
                             duplicate_count += 1
                             print(f"Duplicate domain found: {domain} (line {line_num})")
                             continue
-                        
-                        if domain:
-                            seen_domains.add(domain)
-                        
-                        schools_data.append({
-                            'cds_code': cds_code,
-                            'website': clean_url,
-                            'email': email,
-                            'domain': domain,
-                            'school_name': data.get('school', '').strip(),
-                            'county': data.get('county', '').strip(),
-                            'district': data.get('district', '').strip()
-                        })
-                
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing line {line_num}: {e}")
-                    continue
-    
-    # Write to CSV
-    print(f"Writing {len(schools_data)} unique schools to {output_csv}...")
-    
-    with open(output_csv, 'w', newline='', encoding='utf-8') as f:
-        fieldnames = ['cds_code', 'website', 'email', 'domain', 'school_name', 'county', 'district']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        
-        writer.writeheader()
-        writer.writerows(schools_data)
+                        seen_domains.add(key)
+                    
+                    writer.writerow(row)
+                    written += 1
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
     
     print(f"Extraction complete!")
     print(f"Total schools processed: {line_num}")
-    print(f"Unique schools with websites: {len(schools_data)}")
+    print(f"Unique schools with websites: {written}")
     print(f"Duplicate domains skipped: {duplicate_count}")
     print(f"Output saved to: {output_csv}")
     
-    return schools_data
+    return written
 
 if __name__ == "__main__":
     jsonl_file = "schools_charter_20250919_002920.jsonl"
     output_csv = "charter_schools_for_scraping.csv"
     
-    schools_data = extract_charter_data(jsonl_file, output_csv)
+    extract_charter_data(jsonl_file, output_csv)
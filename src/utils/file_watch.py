@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Shared file-watching and redraw helpers for the progress monitors.
+"""
+
+import os
+import sys
+from abc import ABCMeta, abstractmethod
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
+
+# Cursor home + erase display; written directly instead of running `clear`
+_CLEAR = '\x1b[H\x1b[2J'
+
+# Minimum seconds between redraws, so a burst of writes causes one redraw
+MIN_REDRAW_INTERVAL = 0.2
+
+CHANGE_EVENTS = frozenset({'created', 'modified', 'moved', 'deleted'})
+
+
+def clear_screen():
+    """Clear the terminal before a redraw."""
+    if os.name == 'posix':
+        sys.stdout.write(_CLEAR)
+    else:
+        os.system('cls')
+
+
+class ChangeHandler(FileSystemEventHandler, metaclass=ABCMeta):
+    """Set an event whenever a file accepted by matches() changes."""
+    
+    def __init__(self, changed):
+        self.changed = changed
+    
+    @abstractmethod
+    def matches(self, path):
+        """Return True if changes to path should trigger a redraw."""
+    
+    def on_change(self, event):
+        """Hook run before the event is set; the default does nothing."""
+    
+    def on_any_event(self, event):
+        # Opened/closed events come from our own reads; ignore them
+        if event.is_directory or event.event_type not in CHANGE_EVENTS:
+            return
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if path and self.matches(path):
+                self.on_change(event)
+                self.changed.set()
+                return
+
+
+def start_observer(handler, watch_dirs):
+    """Watch the given directories, falling back to stat polling.
+
+    Returns the running observer, or None if neither kind could start.
+    """
+    for observer_class in (Observer, PollingObserver):
+        observer = observer_class()
+        try:
+            for path in watch_dirs:
+                observer.schedule(handler, path=path, recursive=False)
+            observer.start()
+            return observer
+        except OSError:
+            # e.g. inotify watch limit reached or directory missing
+            continue
+    return None
@@ -3,48 +3,152 @@
 Real-time Scraping Monitor
 
 This script monitors the scraping progress in real-time by watching
-the progress file and log files.
+the progress file and log files. If the scraper publishes progress on a
+UNIX socket (newline-delimited JSON objects, each merged into the current
+state), the monitor reads that instead of re-reading the progress file.
 """
 
-import json
+import orjson
 import time
 import os
-import sys
+import socket
+import threading
+from collections import deque
 from datetime import datetime, timedelta
-import subprocess
+import sys
+from pathlib import Path
+
+# Add src directory to Python path (also when run directly)
+_SRC_DIR = str(Path(__file__).resolve().parent.parent)
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from utils.file_watch import ChangeHandler, MIN_REDRAW_INTERVAL, clear_screen, start_observer
+
+# How far back to look the first time a large, already-populated log is opened
+LOG_TAIL_WINDOW = 64 * 1024
+
+DEFAULT_PROGRESS_SOCKET = '/tmp/scraper.sock'
+
+
+class _FileChangeHandler(ChangeHandler):
+    """Set an event whenever one of the watched files is written or replaced."""
+    
+    def __init__(self, paths, changed):
+        super().__init__(changed)
+        self.paths = {os.path.abspath(p) for p in paths}
+    
+    def matches(self, path):
+        return os.path.abspath(path) in self.paths
 
 
 class ScrapingMonitor:
     """Monitor scraping progress in real-time."""
     
-    def __init__(self, progress_file='scraping_progress.json', log_file='scraping.log'):
+    def __init__(self, progress_file='scraping_progress.json', log_file='scraping.log',
+                 progress_socket=DEFAULT_PROGRESS_SOCKET):
         self.progress_file = progress_file
         self.log_file = log_file
+        self.progress_socket = progress_socket
         self.last_size = 0
         self.start_time = None
+        self._log_offset = 0
+        self._tail = deque(maxlen=10)
+        self._cached_stat = None
+        self._cached_progress = {}
+        self._start_elapsed = None  # elapsed seconds at _start_anchor
+        self._start_anchor = 0.0
+        self._socket_live = False
+        self._socket_state = {}
         
     def load_progress(self):
-        """Load progress data from file."""
+        """Load progress data from the socket feed, or else from file.
+
+        The parsed file is cached against its mtime and size, so an
+        unchanged file costs one stat call instead of a full re-parse.
+        """
+        if self._socket_live:
+            progress = self._socket_state
+            self._update_start(progress.get('start_time', ''))
+            return progress
+        
         try:
-            if os.path.exists(self.progress_file):
-                with open(self.progress_file, 'r') as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            pass
-        return {}
+            st = os.stat(self.progress_file)
+        except OSError:
+            self._cached_stat = None
+            self._cached_progress = {}
+            return {}
+        
+        key = (st.st_mtime_ns, st.st_size)
+        if key == self._cached_stat:
+            return self._cached_progress
+        
+        try:
+            with open(self.progress_file, 'rb') as f:
+                progress = orjson.loads(f.read())
+        except orjson.JSONDecodeError:
+            # Probably caught mid-write; show the last good data and retry next time
+            return self._cached_progress
+        except OSError:
+            return {}
+        
+        self._cached_stat = key
+        self._cached_progress = progress
+        self._update_start(progress.get('start_time', ''))
+        return progress
+    
+    def _update_start(self, start_time):
+        """Parse start_time only when it changes and anchor it to the monotonic clock."""
+        if start_time == self.start_time:
+            return
+        self.start_time = start_time
+        self._start_elapsed = None
+        if not start_time:
+            return
+        try:
+            start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+        except ValueError:
+            return
+        self._start_elapsed = (datetime.now() - start_dt.replace(tzinfo=None)).total_seconds()
+        self._start_anchor = time.monotonic()
+    
+    def elapsed_seconds(self):
+        """Seconds since the scrape started, or None if the start time is unknown."""
+        if self._start_elapsed is None:
+            return None
+        return self._start_elapsed + (time.monotonic() - self._start_anchor)
     
     def get_log_tail(self, lines=10):
-        """Get the last N lines from the log file."""
+        """Get the last N lines from the log file.
+
+        Only the bytes appended since the previous call are read; the most
+        recent lines are kept in a bounded deque between refreshes.
+        """
         try:
-            if os.path.exists(self.log_file):
-                result = subprocess.run(
-                    ['tail', '-n', str(lines), self.log_file],
-                    capture_output=True, text=True
-                )
-                return result.stdout
-        except:
-            pass
-        return ""
+            with open(self.log_file, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < self._log_offset:
+                    # Log was truncated or rotated - start over
+                    self._log_offset = 0
+                    self._tail.clear()
+                skip_partial = False
+                if self._log_offset == 0 and size > LOG_TAIL_WINDOW:
+                    self._log_offset = size - LOG_TAIL_WINDOW
+                    skip_partial = True
+                f.seek(self._log_offset)
+                new = f.read()
+                # Leave a half-written last line for the next refresh
+                end = new.rfind(b'\n') + 1
+                new = new[:end]
+                self._log_offset += end
+        except OSError:
+            return '\n'.join(list(self._tail)[-lines:])
+
+        new_lines = new.decode('utf-8', errors='replace').splitlines()
+        if skip_partial and new_lines:
+            new_lines = new_lines[1:]
+        self._tail.extend(new_lines)
+        return '\n'.join(list(self._tail)[-lines:])
     
     def format_duration(self, seconds):
         """Format duration in human-readable format."""
@@ -61,7 +165,7 @@ class ScrapingMonitor:
     
     def display_progress(self, progress_data):
         """Display current progress."""
-        os.system('clear' if os.name == 'posix' else 'cls')
+        clear_screen()
         
         print("🔍 CHARTER SCHOOLS SCRAPING MONITOR")
         print("=" * 60)
@@ -74,8 +178,13 @@ class ScrapingMonitor:
         start_time = progress_data.get('start_time', '')
         end_time = progress_data.get('end_time', '')
         total_items = progress_data.get('total_items', 0)
-        completed_urls = len(progress_data.get('completed_urls', []))
-        failed_urls = len(progress_data.get('failed_urls', []))
+        # Newer progress files carry plain counters; older ones only the URL lists
+        completed_urls = progress_data.get('completed_count')
+        if completed_urls is None:
+            completed_urls = len(progress_data.get('completed_urls', ()))
+        failed_urls = progress_data.get('failed_count')
+        if failed_urls is None:
+            failed_urls = len(progress_data.get('failed_urls', ()))
         
         print(f"📅 Started: {start_time}")
         if end_time:
@@ -103,13 +212,12 @@ class ScrapingMonitor:
         # Time estimates
         if start_time and not end_time:
             try:
-                start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                elapsed = datetime.now() - start_dt.replace(tzinfo=None)
+                elapsed = self.elapsed_seconds()
                 
-                print(f"⏱️  Elapsed time: {self.format_duration(elapsed.total_seconds())}")
+                print(f"⏱️  Elapsed time: {self.format_duration(elapsed)}")
                 
                 if completed_urls > 0:
-                    rate = completed_urls / elapsed.total_seconds()
+                    rate = completed_urls / elapsed
                     remaining = total_schools - completed_urls
                     if rate > 0:
                         eta_seconds = remaining / rate
@@ -134,30 +242,96 @@ class ScrapingMonitor:
         print("=" * 60)
         print("Press Ctrl+C to stop monitoring")
     
+    def _start_observer(self, changed):
+        """Watch the progress and log files, falling back to stat polling."""
+        handler = _FileChangeHandler([self.progress_file, self.log_file], changed)
+        watch_dirs = {os.path.dirname(os.path.abspath(p))
+                      for p in (self.progress_file, self.log_file)}
+        return start_observer(handler, watch_dirs)
+    
+    def _connect_socket(self):
+        """Connect to the scraper's progress socket, or return None if it isn't there."""
+        if not self.progress_socket or not hasattr(socket, 'AF_UNIX'):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.progress_socket)
+        except OSError:
+            sock.close()
+            return None
+        return sock
+    
+    def _read_socket(self, sock, changed):
+        """Merge progress updates from the socket until the scraper hangs up."""
+        try:
+            with sock, sock.makefile('rb') as stream:
+                for line in stream:
+                    try:
+                        update = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        continue
+                    if isinstance(update, dict):
+                        # Swap in a new dict so the main thread never sees a half-applied update
+                        self._socket_state = {**self._socket_state, **update}
+                        changed.set()
+        except OSError:
+            pass
+        finally:
+            # Back to the progress file for whatever comes next
+            self._socket_live = False
+            changed.set()
+    
     def monitor(self, refresh_interval=5):
-        """Start monitoring the scraping progress."""
+        """Start monitoring the scraping progress.
+
+        Redraws as soon as a socket update arrives or the progress or log file
+        changes, and at least every refresh_interval seconds so the elapsed
+        time and ETA keep moving.
+        """
+        changed = threading.Event()
+        sock = self._connect_socket()
+        
         print("🚀 Starting scraping monitor...")
-        print(f"📁 Monitoring: {self.progress_file}")
+        if sock is not None:
+            print(f"🔌 Monitoring: {self.progress_socket}")
+        else:
+            print(f"📁 Monitoring: {self.progress_file}")
         print(f"📋 Log file: {self.log_file}")
         print(f"🔄 Refresh interval: {refresh_interval} seconds")
         print()
         
+        if sock is not None:
+            self._socket_live = True
+            threading.Thread(target=self._read_socket, args=(sock, changed), daemon=True).start()
+        observer = self._start_observer(changed)
+        last_draw = 0.0
+        
         try:
             while True:
+                since_last = time.monotonic() - last_draw
+                if since_last < MIN_REDRAW_INTERVAL:
+                    time.sleep(MIN_REDRAW_INTERVAL - since_last)
+                changed.clear()
+                
                 progress_data = self.load_progress()
                 self.display_progress(progress_data)
+                last_draw = time.monotonic()
                 
                 # Check if scraping is complete
                 if progress_data.get('end_time'):
                     print("\n🎉 Scraping completed!")
                     break
                 
-                time.sleep(refresh_interval)
+                changed.wait(refresh_interval)
                 
         except KeyboardInterrupt:
             print("\n\n👋 Monitoring stopped by user")
         except Exception as e:
             print(f"\n❌ Error: {e}")
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
 
 
 def main():
@@ -169,12 +343,15 @@ def main():
                        help='Progress file to monitor (default: scraping_progress.json)')
     parser.add_argument('--log-file', default='scraping.log',
                        help='Log file to monitor (default: scraping.log)')
+    parser.add_argument('--socket', default=DEFAULT_PROGRESS_SOCKET,
+                       help='Progress socket to read if the scraper provides one '
+                            f'(default: {DEFAULT_PROGRESS_SOCKET})')
     parser.add_argument('--refresh', type=int, default=5,
                        help='Refresh interval in seconds (default: 5)')
     
     args = parser.parse_args()
     
-    monitor = ScrapingMonitor(args.progress_file, args.log_file)
+    monitor = ScrapingMonitor(args.progress_file, args.log_file, args.socket)
     monitor.monitor(args.refresh)
 
 
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for reading and cleaning fetched pages.
+
+Used by both scrapers and the robots.txt checker.
+"""
+
+# Pages larger than this are skipped (by Content-Length) or truncated when read
+MAX_RESPONSE_BYTES = 2_000_000
+
+
+def collapse_whitespace(text, limit):
+    """
+    Return ' '.join(text.split())[:limit] without splitting the whole text.
+    
+    Only a window twice the limit is split; its last token may be cut off
+    mid-word, so it is dropped, and the full text is used only if what
+    remains is still shorter than the limit.
+    """
+    window = limit * 2
+    if len(text) > window:
+        head = ' '.join(text[:window].split()[:-1])
+        if len(head) >= limit:
+            return head[:limit]
+    return ' '.join(text.split())[:limit]
+
+
+async def read_capped(stream, limit):
+    """Read up to limit bytes of an aiohttp response body.
+
+    StreamReader.read(n) only returns what is already buffered, so keep
+    reading until the cap or EOF.
+    """
+    chunks = []
+    size = 0
+    async for chunk in stream.iter_any():
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return b''.join(chunks)[:limit]
@@ -6,7 +6,89 @@ Simple Progress Monitor for Charter Schools Scraper
 import time
 import os
 import json
+import mmap
+import re
+import threading
 from datetime import datetime
+import sys
+from pathlib import Path
+
+# Add src directory to Python path (also when run directly)
+_SRC_DIR = str(Path(__file__).resolve().parent.parent)
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+from utils.file_watch import ChangeHandler, MIN_REDRAW_INTERVAL, clear_screen, start_observer
+
+# Bytes of the results CSV scanned per slice when counting rows
+COUNT_CHUNK = 1 << 20
+
+# A row containing ',200,' anywhere, as the old readlines check tested
+_SUCCESS_ROW = re.compile(rb'^[^\n]*?,200,', re.MULTILINE)
+
+# Seconds before the directory is rescanned for a newer results file
+RESCAN_INTERVAL = 30
+
+# Most recent results file found by find_latest_csv, and when it was looked up
+_LATEST = {'name': None, 'checked': 0.0}
+
+
+class ResultsChangeHandler(ChangeHandler):
+    """Set an event whenever a scraped_schools_*.csv file changes."""
+    
+    def matches(self, path):
+        name = os.path.basename(path)
+        return name.startswith('scraped_schools_') and name.endswith('.csv')
+    
+    def on_change(self, event):
+        if event.event_type != 'modified':
+            # A results file appeared or went away; look again
+            _LATEST['checked'] = 0.0
+
+
+def count_results(path):
+    """Return (rows, successful rows, last line) for a results CSV.
+
+    The file is memory-mapped: newlines are counted with bytes.count over
+    COUNT_CHUNK slices and successful rows with a line-anchored regex, so
+    memory use stays flat however large the scraped content columns get.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0, 0, ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            lines = 0
+            for pos in range(0, size, COUNT_CHUNK):
+                lines += mm[pos:pos + COUNT_CHUNK].count(b'\n')
+            
+            # Each match ends at a row's first marker and the next one must
+            # start a new line, so a row counts once however often "200" appears
+            header_end = mm.find(b'\n') + 1 or size
+            successful = sum(1 for _ in _SUCCESS_ROW.finditer(mm, header_end))
+            
+            end = size
+            if mm[size - 1] == ord('\n'):
+                end -= 1
+            else:
+                lines += 1  # last line still being written
+            start = mm.rfind(b'\n', 0, end) + 1
+            last_line = mm[start:end].decode('utf-8', errors='replace').rstrip('\r')
+    return lines - 1, successful, last_line
+
+
+def find_latest_csv():
+    """Return the newest scraped_schools_*.csv, rescanning only when stale."""
+    name = _LATEST['name']
+    now = time.monotonic()
+    if name is None or now - _LATEST['checked'] > RESCAN_INTERVAL or not os.path.exists(name):
+        with os.scandir('.') as it:
+            names = [entry.name for entry in it
+                     if entry.name.startswith('scraped_schools_')
+                     and entry.name.endswith('.csv') and entry.is_file()]
+        _LATEST['name'] = max(names) if names else None
+        _LATEST['checked'] = now
+    return _LATEST['name']
 
 
 def monitor_progress():
@@ -15,25 +97,21 @@ def monitor_progress():
     print("=" * 50)
     
     # Look for the most recent output files
-    csv_files = [f for f in os.listdir('.') if f.startswith('scraped_schools_') and f.endswith('.csv')]
-    if not csv_files:
+    latest_csv = find_latest_csv()
+    if latest_csv is None:
         print("⏳ No scraping results found yet...")
         return
     
-    latest_csv = max(csv_files)
     print(f"📄 Monitoring: {latest_csv}")
     
     try:
-        with open(latest_csv, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        total_schools, successful, last_line = count_results(latest_csv)
         
-        if len(lines) <= 1:  # Only header
+        if total_schools <= 0:  # Only header
             print("⏳ Scraping in progress...")
             return
         
         # Count results
-        total_schools = len(lines) - 1  # Subtract header
-        successful = sum(1 for line in lines[1:] if ',200,' in line)
         failed = total_schools - successful
         
         print(f"📊 Progress: {total_schools} schools processed")
@@ -43,9 +121,8 @@ def monitor_progress():
             print(f"📈 Success rate: {successful/total_schools*100:.1f}%")
         
         # Show latest school
-        if lines:
-            latest_school = lines[-1].split(',')[1]  # School name
-            print(f"🔄 Latest: {latest_school}")
+        latest_school = last_line.split(',')[1]  # School name
+        print(f"🔄 Latest: {latest_school}")
         
     except Exception as e:
         print(f"❌ Error reading file: {e}")
@@ -53,15 +130,31 @@ def monitor_progress():
 
 def main():
     """Main function."""
+    changed = threading.Event()
+    observer = start_observer(ResultsChangeHandler(changed), ['.'])
+    last_draw = 0.0
     try:
         while True:
-            os.system('clear' if os.name == 'posix' else 'cls')
+            since_last = time.monotonic() - last_draw
+            if since_last < MIN_REDRAW_INTERVAL:
+                time.sleep(MIN_REDRAW_INTERVAL - since_last)
+            changed.clear()
+            
+            clear_screen()
             monitor_progress()
             print("\nPress Ctrl+C to stop monitoring")
-            time.sleep(5)
+            last_draw = time.monotonic()
+            
+            # Only redraw when a results file changes; the timeout just keeps
+            # Ctrl+C responsive, and without an observer we poll every 5s
+            while not changed.wait(5) and observer is not None:
+                pass
     except KeyboardInterrupt:
         print("\n👋 Monitoring stopped")
-
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
 
 if __name__ == "__main__":
     main()